@@ -0,0 +1,82 @@
+// replaceMeetingSlide.html 的背景執行緒：Pyodide 與 meeting_slide_tool.py 都在這裡跑，頁面不會卡住。
+//
+// 頁面 → worker：
+//   { type: 'run', params: {year, month, speaker, supervisor},
+//     files: {template, report?, doc?, proposal?} }   // ArrayBuffer，以 transfer 傳入
+// worker → 頁面：
+//   { type: 'boot', stages }                 啟動階段耗時（見 pyodideBoot.js）
+//   { type: 'ready', stages, total }         可以開始處理
+//   { type: 'imported', ms }                 背景載入模組完成
+//   { type: 'progress', stage }              replace_pptx 的各階段（見 PROGRESS_STAGES）
+//   { type: 'log', text }                    Python 的 print 輸出
+//   { type: 'done', output, summary, stats } output 為 ArrayBuffer（transfer 回頁面）；stats 見 RunStats.to_dict()
+//   { type: 'error', message }
+
+importScripts('https://cdn.jsdelivr.net/pyodide/v0.29.3/full/pyodide.js', 'pyodideBoot.js');
+
+const FILE_PATHS = {
+    template: '/slide-template.pptx',
+    report: '/report.pptx',
+    doc: '/doc.docx',
+    proposal: '/proposal.pptx',
+};
+
+let pyodide = null;
+let ensureTool = null;
+
+const ready = (async () => {
+    const scriptPromise = fetch('./meeting_slide_tool.py').then(resp => resp.text());
+    const boot = await bootPyodide({
+        packages: ['python-pptx', 'lxml'],
+        onStage: (stage, stages) => postMessage({ type: 'boot', stages }),
+    });
+    pyodide = boot.pyodide;
+    pyodide.setStdout({ batched: text => postMessage({ type: 'log', text }) });
+    pyodide.setStderr({ batched: text => postMessage({ type: 'log', text }) });
+
+    // 模組只 import 一次，公版分析、Word 解析結果等快取可跨次重用
+    pyodide.FS.mkdirTree('/tool');
+    pyodide.FS.writeFile('/tool/meeting_slide_tool.py', await scriptPromise);
+    ensureTool = deferImport(pyodide, `
+import sys
+if '/tool' not in sys.path:
+    sys.path.insert(0, '/tool')
+from meeting_slide_tool import run_replace
+`, ms => postMessage({ type: 'imported', ms }));
+
+    postMessage({ type: 'ready', stages: boot.stages, total: boot.total });
+})();
+
+ready.catch(error => postMessage({ type: 'error', message: String(error && error.message || error), fatal: true }));
+
+async function run({ params, files }) {
+    await ready;
+    await ensureTool();
+
+    for (const [name, path] of Object.entries(FILE_PATHS)) {
+        if (files[name]) pyodide.FS.writeFile(path, new Uint8Array(files[name]));
+    }
+
+    const runReplace = pyodide.globals.get('run_replace');
+    try {
+        const summary = runReplace.callKwargs(
+            params.year, params.month, params.speaker, params.supervisor,
+            Boolean(files.report), Boolean(files.doc), Boolean(files.proposal),
+            { progress: stage => postMessage({ type: 'progress', stage }), stats_path: '/stats.json' },
+        );
+        const stats = JSON.parse(pyodide.FS.readFile('/stats.json', { encoding: 'utf8' }));
+        const output = pyodide.FS.readFile('/output.pptx').buffer;
+        postMessage({ type: 'done', output, summary, stats }, [output]);
+    } finally {
+        runReplace.destroy();
+    }
+}
+
+self.onmessage = async event => {
+    if (event.data.type !== 'run') return;
+    try {
+        await run(event.data);
+    } catch (error) {
+        postMessage({ type: 'error', message: String(error && error.message || error) });
+    }
+};
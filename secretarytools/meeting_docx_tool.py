@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+月例會會議紀錄（Word）轉換：convertMeetingWord.html 在 Pyodide 中使用，也可以直接執行。
+只依賴 python-docx，不需要 python-pptx。
+
+用法：
+    python3 meeting_docx_tool.py <file.docx> --date 2026-03-05 --time 19:30 --room 三樓講堂 \\
+        --name 蘭陽分會 --chairman 王小明 --mc 李小華 --computer 陳大同
+
+處理內容：
+    第 1 個表格   日期／時間／地點、主席／司儀／電腦、「9.宣講員宣講」、「16.輔導法師開示」
+    全文件        「聯合月例會活動討論案」→「{分會}月例會活動討論案」（20 pt 標楷體）
+    所有表格      分會名稱改為粗體 + 黃色底色，所在儲存格也設為黃色
+    文字框        刪除含「聯合月例會】」的文字框
+
+輸出：在原檔名後加 _converted，例如 minutes_converted.docx
+"""
+
+import argparse
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from docx.text.paragraph import Paragraph
+
+W_NS       = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+WPS_NS     = "http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+W_P_TAG    = f"{{{W_NS}}}p"
+W_T_TAG    = f"{{{W_NS}}}t"
+W_TBL_TAG  = f"{{{W_NS}}}tbl"
+W_TR_TAG   = f"{{{W_NS}}}tr"
+W_TC_TAG   = f"{{{W_NS}}}tc"
+W_SHD_TAG  = f"{{{W_NS}}}shd"
+WPS_TXBX_TAG = f"{{{WPS_NS}}}txbx"
+
+DEFAULT_FONT = "標楷體"
+HIGHLIGHT_FILL = "FFFF00"
+
+
+# ── 一次走訪的替換／標示引擎 ─────────────────────────────────────────────────────
+
+def _set_east_asia_font(run, font_name):
+    run._element.get_or_add_rPr().rFonts.set(qn("w:eastAsia"), font_name)
+
+
+def _shading(fill):
+    shd = OxmlElement("w:shd")
+    shd.set(qn("w:val"), "clear")
+    shd.set(qn("w:color"), "auto")
+    shd.set(qn("w:fill"), fill)
+    return shd
+
+
+class DocxFiller:
+    """
+    一次走訪 body 段落與表格儲存格，同時套用所有替換與標示。
+
+    - mapping {舊文字: 新文字}：段落（以 run 文字串起來）含任一舊文字時，依 mapping 順序替換，
+      結果放進第一個 run、其餘 run 清空；font_sizes 有指定該舊文字時，第一個 run 改為標楷體並套用字級
+    - highlights：只在表格儲存格內處理；段落依標示文字切開重建 run，標示文字為粗體 + 黃色底色，
+      儲存格背景也設為黃色
+    走訪範圍與 python-docx 的 doc.paragraphs、doc.tables → rows → cells → paragraphs 相同，
+    但直接走 XML：每個 w:tc 只經過一次（合併儲存格不會因 row.cells 重複而重做）。
+    """
+
+    def __init__(self, mapping, highlights=(), font_sizes=None):
+        self.mapping = {old: new for old, new in mapping.items() if old}
+        self.font_sizes = dict(font_sizes or {})
+        self.highlights = sorted({h for h in highlights if h}, key=len, reverse=True)
+        keys = sorted(set(self.mapping) | set(self.highlights), key=len, reverse=True)
+        # 粗篩：段落內全部 w:t 的文字都不含任何關鍵字就不必建立 Paragraph 物件
+        self._any_re = re.compile("|".join(map(re.escape, keys))) if keys else None
+        self._highlight_re = (re.compile("(" + "|".join(map(re.escape, self.highlights)) + ")")
+                              if self.highlights else None)
+        self.counts = {"paragraphs": 0, "replaced": 0, "highlighted": 0, "cells_highlighted": 0}
+
+    def fill(self, doc):
+        """處理整份文件；回傳各項計數。"""
+        if self._any_re is None:
+            return self.counts
+        parent = doc._body
+        for child in doc.element.body.iterchildren(W_P_TAG, W_TBL_TAG):
+            if child.tag == W_P_TAG:
+                self._fill_paragraph(child, parent)
+                continue
+            for tr in child.iterchildren(W_TR_TAG):
+                for tc in tr.iterchildren(W_TC_TAG):
+                    highlighted = False
+                    for p in tc.iterchildren(W_P_TAG):
+                        highlighted |= self._fill_paragraph(p, parent, in_cell=True)
+                    if highlighted:
+                        self._shade_cell(tc)
+        return self.counts
+
+    def _fill_paragraph(self, p, parent, in_cell=False):
+        """回傳是否有標示（供儲存格上色）。"""
+        self.counts["paragraphs"] += 1
+        if not self._any_re.search("".join(p.itertext(W_T_TAG))):
+            return False
+        paragraph = Paragraph(p, parent)
+        self._replace(paragraph)
+        return in_cell and self._highlight(paragraph)
+
+    def _replace(self, paragraph):
+        runs = paragraph.runs
+        full_text = "".join(run.text for run in runs)
+        text = full_text
+        font_size = None
+        for old, new in self.mapping.items():
+            if old in text:
+                text = text.replace(old, new)
+                font_size = self.font_sizes.get(old, font_size)
+        if text == full_text and font_size is None:
+            return
+        for i, run in enumerate(runs):
+            run.text = "" if i > 0 else text
+        if font_size:
+            first = runs[0]
+            first.font.name = DEFAULT_FONT
+            first.font.size = Pt(font_size)
+            _set_east_asia_font(first, DEFAULT_FONT)
+        self.counts["replaced"] += 1
+
+    def _highlight(self, paragraph):
+        if self._highlight_re is None:
+            return False
+        runs = paragraph.runs
+        full_text = "".join(run.text for run in runs)
+        if not self._highlight_re.search(full_text):
+            return False
+
+        # 沿用段落原有的字型與字級（找到字級就停）
+        font_name = DEFAULT_FONT
+        font_size = None
+        for run in runs:
+            if run.font.name:
+                font_name = run.font.name
+            if run.font.size:
+                font_size = run.font.size
+            if font_size:
+                break
+
+        paragraph.clear()
+        for i, part in enumerate(self._highlight_re.split(full_text)):
+            if not part:
+                continue
+            run = paragraph.add_run(part)
+            if i % 2 == 0:
+                run.font.name = font_name
+                _set_east_asia_font(run, font_name)
+            else:
+                run.bold = True
+                run.font.name = DEFAULT_FONT
+                _set_east_asia_font(run, DEFAULT_FONT)
+            if font_size:
+                run.font.size = font_size
+            if i % 2:
+                run._element.get_or_add_rPr().append(_shading(HIGHLIGHT_FILL))
+        self.counts["highlighted"] += 1
+        return True
+
+    def _shade_cell(self, tc):
+        tcPr = tc.get_or_add_tcPr()
+        for shd in tcPr.findall(W_SHD_TAG):
+            tcPr.remove(shd)
+        tcPr.append(_shading(HIGHLIGHT_FILL))
+        self.counts["cells_highlighted"] += 1
+
+
+def fill_docx(doc, mapping, highlights=(), font_sizes=None):
+    """以 DocxFiller 一次處理 doc 的所有替換與標示；回傳計數。"""
+    return DocxFiller(mapping, highlights, font_sizes).fill(doc)
+
+
+# ── 會議紀錄轉換 ──────────────────────────────────────────────────────────────
+
+ROC_YEAR_OFFSET = 1911
+WEEKDAY_ZH = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+TITLE_PLACEHOLDER = "聯合月例會活動討論案"
+TITLE_FONT_SIZE = 20
+TEXTBOX_TO_DELETE = "聯合月例會】"
+
+
+def format_date_cell(date_str, time_str, room_str):
+    dt = datetime.strptime(date_str, "%Y-%m-%d")
+    roc_year = dt.year - ROC_YEAR_OFFSET
+    weekday = WEEKDAY_ZH[dt.weekday()]
+    hour, minute = map(int, time_str.split(':'))
+    if 18 <= hour <= 23:
+        period = "晚上"
+        display_hour = hour - 12 if hour > 12 else hour
+    elif 12 <= hour < 18:
+        period = "下午"
+        display_hour = hour - 12
+    else:
+        period = "早上"
+        display_hour = hour
+    time_display = f"{period}{display_hour:02d}:{minute:02d}"
+    return (
+        f"日期：{roc_year} 年{dt.month:02d}月{dt.day:02d}日（{weekday}）\n"
+        f"時間：{time_display}\n"
+        f"地點：{room_str}"
+    )
+
+
+def set_cell_text(cell, text, font_size=11):
+    cell.text = text
+    for p in cell.paragraphs:
+        for run in p.runs:
+            run.font.name = DEFAULT_FONT
+            _set_east_asia_font(run, DEFAULT_FONT)
+            run.font.size = Pt(font_size)
+
+
+def set_cell_text_table_align(cell, text, font_size=11):
+    """只保留第一段並改寫其文字（沿用段落格式，表格對齊不跑掉）。"""
+    if not cell.paragraphs:
+        cell.text = text
+        return
+    p = cell.paragraphs[0]
+    p.text = ""
+    run = p.add_run(text)
+    run.font.name = DEFAULT_FONT
+    _set_east_asia_font(run, DEFAULT_FONT)
+    run.font.size = Pt(font_size)
+    for extra in cell.paragraphs[1:]:
+        extra._element.getparent().remove(extra._element)
+
+
+def delete_textbox_containing(doc, search_text):
+    for txbx in list(doc.element.body.iter(WPS_TXBX_TAG)):
+        text = ''.join(t.text or '' for t in txbx.iter(W_T_TAG))
+        if search_text in text:
+            # txbx → … → 所在的 w:r（往上 8 層），整個 run 移除
+            node = txbx
+            for _ in range(8):
+                node = node.getparent()
+            parent = node.getparent()
+            if parent is not None:
+                parent.remove(node)
+
+
+def convert_meeting_docx(input_path, output_path, date_str, time_str, room, name, chairman, mc, computer):
+    """把會議紀錄公版填入本次月例會資訊並存到 output_path；回傳 fill_docx 的計數。"""
+    doc = Document(str(input_path))
+    table = doc.tables[0]
+
+    # Row 0, Col 0：日期區塊
+    set_cell_text(table.rows[0].cells[0], format_date_cell(date_str, time_str, room))
+
+    # Row 0, Col 2：主席 / 司儀 / 電腦
+    set_cell_text(table.rows[0].cells[2], f"主席：{chairman}\n司儀：{mc}\n電腦：{computer}")
+
+    # Row 3, Col 0；Row 4, Col 4
+    set_cell_text_table_align(table.rows[3].cells[0], "9.宣講員宣講")
+    set_cell_text_table_align(table.rows[4].cells[4], "16.輔導法師開示")
+
+    # 標題替換與分會名稱標示一次走訪完成
+    counts = fill_docx(
+        doc,
+        {TITLE_PLACEHOLDER: f"{name}月例會活動討論案"},
+        highlights=[name],
+        font_sizes={TITLE_PLACEHOLDER: TITLE_FONT_SIZE},
+    )
+
+    delete_textbox_containing(doc, TEXTBOX_TO_DELETE)
+
+    doc.save(str(output_path))
+    return counts
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="把月例會會議紀錄公版填入本次資訊。")
+    parser.add_argument("input", help="輸入的 .docx 檔案路徑")
+    parser.add_argument("--date", required=True, help="日期 YYYY-MM-DD")
+    parser.add_argument("--time", required=True, help="時間 HH:MM")
+    parser.add_argument("--room", required=True, help="地點")
+    parser.add_argument("--name", required=True, help="分會名稱")
+    parser.add_argument("--chairman", required=True, help="主席")
+    parser.add_argument("--mc", required=True, help="司儀")
+    parser.add_argument("--computer", required=True, help="電腦")
+    parser.add_argument("--output", help="選填：輸出路徑（預設在原檔名後加 _converted）")
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"❌ 找不到輸入檔案：{input_path}", file=sys.stderr)
+        sys.exit(1)
+    output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_converted.docx")
+
+    counts = convert_meeting_docx(input_path, output_path, args.date, args.time, args.room, args.name,
+                                  args.chairman, args.mc, args.computer)
+    print(f"✅ 已儲存：{output_path}（替換 {counts['replaced']} 段、標示 {counts['highlighted']} 段）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+meeting_slide_tool 的效能基準測試。
+
+用法：
+    python3 meeting_slide_bench.py                           # small, medium 兩種規模
+    python3 meeting_slide_bench.py --sizes small medium large --repeat 5
+    python3 meeting_slide_bench.py --output bench.json --compare last.json
+
+每種規模先產生合成輸入（暫存目錄）：
+    公版        N 張投影片，含多層群組圖形與 [[...]] 佔位符，以及各錨點關鍵字投影片
+    報告簡報    M 張，圖片共用（同一張 logo）或各自不同
+    提案簡報    M 張，夾在「提案討論」…「臨時動議」之間，前後各有不會被複製的投影片
+    會議紀錄    K 個【提案…】／案由：／執行成效：段落
+
+分別計時 replace_pptx、insert_report_slides、insert_external_proposal_slides、
+insert_proposal_slides、parse_docx_proposals、extract_proposal_summary_text，
+每項取 repeat 次中的最小值與中位數，另跑一次 tracemalloc 取記憶體高峰。
+每次計時前清掉模組層級的快取（公版分析、Word 解析），量到的是冷啟動的成本。
+計時前先做正確性檢查（增量重建、批次處理、記憶體釋放、投影片規則、圖表活頁簿、提案分頁，--no-checks 略過），不符時以 AssertionError 結束。
+
+輸出：JSON（預設 meeting_slide_bench-<時間>.json），--compare 與先前的結果比較。
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import meeting_slide_tool as mst
+from docx import Document
+from PIL import Image
+from pptx import Presentation
+from pptx.enum.text import MSO_AUTO_SIZE
+from pptx.util import Inches, Pt
+
+SIZES = {
+    #        公版張數  群組層數  報告/提案張數  提案數
+    "small":  {"n": 10,  "depth": 2, "m": 10,  "k": 5},
+    "medium": {"n": 40,  "depth": 3, "m": 60,  "k": 20},
+    "large":  {"n": 120, "depth": 4, "m": 200, "k": 60},
+}
+
+ANCHOR_KEYWORDS = ["決議案執行成效", "工作報告", "提案討論", "臨時動議", "散會"]
+PROPOSAL_PLACEHOLDERS = ["{{ProjectNumber}}", "{{project_title}}", "{{project}}", "{{work_title}}", "{{work}}"]
+
+
+# ── 合成輸入 ──────────────────────────────────────────────────────────────────
+
+def _png(color, size=64):
+    buf = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _textbox(shapes, text, top=1):
+    box = shapes.add_textbox(Inches(1), Inches(top), Inches(6), Inches(1))
+    box.text_frame.text = text
+    return box
+
+
+def make_template(path, n, depth):
+    """
+    公版：提案版面（第 5 個）放 {{...}} 文字方塊，n 張內容投影片含 depth 層群組。
+    提案文字方塊設為自動換行、不自動調整大小（add_textbox 預設是 wrap="none" + spAutoFit），才會走分頁。
+    """
+    prs = Presentation()
+
+    # 版面沒有 add_textbox，先在暫時的投影片上建立再搬進版面
+    layout = prs.slide_layouts[mst.PROPOSAL_LAYOUT_INDEX]
+    tmp = prs.slides.add_slide(prs.slide_layouts[6])
+    for i, text in enumerate(PROPOSAL_PLACEHOLDERS):
+        box = tmp.shapes.add_textbox(Inches(0.5), Inches(0.5 + i * 1.2), Inches(9), Inches(1))
+        box.text_frame.text = text
+        box.text_frame.paragraphs[0].runs[0].font.size = Pt(24)
+        box.text_frame.word_wrap = True
+        box.text_frame.auto_size = MSO_AUTO_SIZE.NONE
+        layout.shapes._spTree.append(box._element)
+    sld_id_lst = prs.slides._sldIdLst
+    prs.part.drop_rel(sld_id_lst[-1].rId)
+    sld_id_lst.remove(sld_id_lst[-1])
+
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    p = _textbox(slide.shapes, "[[Ti").text_frame.paragraphs[0]
+    p.add_run().text = "tle]] 宣講員 [[宣講員]]"  # 佔位符跨 run
+    slide.notes_slide.notes_text_frame.text = "上級指導 [[上級指導]]"
+
+    for i in range(n):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        _textbox(slide.shapes, f"內容 {i}")
+        shapes = slide.shapes
+        for d in range(depth):
+            group = shapes.add_group_shape()
+            _textbox(group.shapes, f"第 {d} 層 {'[[宣講員]]' if d == depth - 1 and i % 5 == 0 else '文字'}")
+            shapes = group.shapes
+        slide.shapes.add_picture(io.BytesIO(_png((i * 20 % 255, 0, 0))), 0, 0)
+
+    for keyword in ANCHOR_KEYWORDS:
+        _textbox(prs.slides.add_slide(prs.slide_layouts[6]).shapes, keyword)
+    prs.save(str(path))
+
+
+def make_deck(path, m, shared_media=True, proposal=False):
+    """報告／提案簡報：m 張內容投影片各帶一張圖片（shared_media 時全部相同）。"""
+    prs = Presentation()
+
+    def add(text, idx=None):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        _textbox(slide.shapes, text)
+        if idx is not None:
+            color = (10, 10, 10) if shared_media else (idx % 255, idx // 255 % 255, 7)
+            slide.shapes.add_picture(io.BytesIO(_png(color)), 0, 0)
+
+    add("封面")
+    if proposal:
+        add("前面的投影片", idx=0)
+        add("提案討論")
+        add("十月份聯合月例會")
+    for i in range(m):
+        add(f"投影片 {i}", idx=i)
+    if proposal:
+        add("各類宣導 布告", idx=1)
+        add("臨時動議")
+        add("之後", idx=2)
+    prs.save(str(path))
+
+
+def make_minutes(path, k):
+    """會議紀錄：k 個提案（案由、執行成效各兩段），之後接總會提案討論與其他段落。"""
+    doc = Document()
+    doc.add_paragraph("月例會會議紀錄")
+    doc.add_paragraph("宣讀上次決議案執行成效")
+    for i in range(k):
+        doc.add_paragraph(f"【提案{i + 1}】第{i + 1}案")
+        doc.add_paragraph(f"案由：第{i + 1}案的案由，" + "說明文字" * (i % 7 + 1))
+        doc.add_paragraph("第二行案由")
+        doc.add_paragraph(f"執行成效：已完成 {i + 1}")
+        doc.add_paragraph("成效第二行")
+    doc.add_paragraph("總會提案討論")
+    doc.add_paragraph("【提案一】總會案")
+    doc.add_paragraph("案由：總會的案由")
+    doc.add_paragraph("說明：略")
+    doc.add_paragraph("工作報告")
+    doc.save(str(path))
+
+
+def make_inputs(directory, size, shared_media=True):
+    spec = SIZES[size]
+    directory = Path(directory)
+    paths = {
+        "template": directory / f"template-{size}.pptx",
+        "report": directory / f"report-{size}.pptx",
+        "proposal": directory / f"proposal-{size}.pptx",
+        "doc": directory / f"minutes-{size}.docx",
+    }
+    make_template(paths["template"], spec["n"], spec["depth"])
+    make_deck(paths["report"], spec["m"], shared_media)
+    make_deck(paths["proposal"], spec["m"], shared_media, proposal=True)
+    make_minutes(paths["doc"], spec["k"])
+    return paths
+
+
+# ── 正確性檢查 ────────────────────────────────────────────────────────────────
+# 計時前先確認各條路徑的輸出正確；任何一項不符就以 AssertionError 結束。
+
+def _slide_texts(path):
+    return [mst._slide_text(slide) for slide in Presentation(str(path)).slides]
+
+
+def check_incremental(paths, directory):
+    """
+    replace_pptx(incremental=True) 連跑兩次：第一次完整產生並寫入增量紀錄，
+    換一份 Word 後第二次走增量更新；結果須與直接完整產生的投影片內容相同。
+    """
+    directory = Path(directory)
+    output = directory / "incremental.pptx"
+    full = directory / "incremental-full.pptx"
+    changed_doc = directory / "minutes-changed.docx"
+    mapping = mst.make_mapping("2026", "1", "宣講員", "上級指導")
+    kwargs = dict(report_path=paths["report"], proposal_path=paths["proposal"], cache_dir=False)
+
+    output.unlink(missing_ok=True)
+    mst._build_manifest_path(output).unlink(missing_ok=True)
+    with redirect_stdout(io.StringIO()):
+        mst.replace_pptx(paths["template"], mapping, output, doc_path=paths["doc"], incremental=True, **kwargs)
+    assert mst._build_manifest_path(output).exists(), "完整產生後沒有寫入增量紀錄"
+
+    make_minutes(changed_doc, len(mst.parse_docx_proposals(paths["doc"])) + 1)
+    log = io.StringIO()
+    with redirect_stdout(log):
+        mst.replace_pptx(paths["template"], mapping, output, doc_path=changed_doc, incremental=True, **kwargs)
+        mst.replace_pptx(paths["template"], mapping, full, doc_path=changed_doc, **kwargs)
+    assert "增量更新" in log.getvalue(), "Word 變動後沒有走增量更新"
+    assert _slide_texts(output) == _slide_texts(full), "增量更新的結果與完整產生不同"
+
+
+def check_batch(paths, directory):
+    """
+    兩筆 job 的批次清單（workers=1 與 2 各跑一次）：每筆都要成功，
+    且每份輸出的投影片與以 replace_pptx 單獨產生的相同。
+    """
+    directory = Path(directory)
+    jobs = [
+        {"year": "2026", "month": "1", "speaker": "甲", "supervisor": "乙",
+         "report": paths["report"].name, "doc": paths["doc"].name},
+        {"year": "2026", "month": "2", "speaker": "丙", "supervisor": "丁",
+         "proposal": paths["proposal"].name, "doc": paths["doc"].name},
+    ]
+    manifest = paths["template"].with_name("batch-check.json")
+    manifest.write_text(json.dumps(jobs, ensure_ascii=False), encoding="utf-8")
+
+    expected = []
+    with redirect_stdout(io.StringIO()):
+        for job in mst.load_manifest(manifest):
+            output = directory / f"batch-expected-{job['index']}.pptx"
+            mst.replace_pptx(paths["template"], mst.make_mapping(job["year"], job["month"], job["speaker"],
+                                                                 job["supervisor"]),
+                             output, report_path=job["report"], doc_path=job["doc"],
+                             proposal_path=job["proposal"], cache_dir=False)
+            expected.append(_slide_texts(output))
+
+    for workers in (1, 2):
+        _clear_caches()
+        with redirect_stdout(io.StringIO()):
+            results = mst.run_batch(paths["template"], manifest, workers=workers, cache_dir=False)
+        for r, texts in zip(results, expected):
+            assert r["error"] is None, f"批次 job #{r['index']}（workers={workers}）失敗：{r['error']}"
+            got = _slide_texts(r["output"])
+            assert len(got) == len(texts), (f"批次 job #{r['index']}（workers={workers}）投影片 {len(got)} 張，"
+                                            f"應為 {len(texts)} 張")
+            assert got == texts, f"批次 job #{r['index']}（workers={workers}）內容與單獨產生不同"
+
+
+def check_release(paths, directory):
+    """replace_pptx 結束後，公版與來源簡報都要能被回收（模組層級的快取不得留住簡報）。"""
+    import gc
+
+    from pptx.parts.presentation import PresentationPart
+
+    def alive():
+        gc.collect()
+        return sum(isinstance(o, PresentationPart) for o in gc.get_objects())
+
+    before = alive()
+    with redirect_stdout(io.StringIO()):
+        mst.replace_pptx(paths["template"], mst.make_mapping("2026", "1", "宣講員", "上級指導"),
+                         Path(directory) / "release.pptx", report_path=paths["report"], doc_path=paths["doc"],
+                         proposal_path=paths["proposal"], cache_dir=False)
+    leaked = alive() - before
+    assert leaked <= 0, f"replace_pptx 之後仍有 {leaked} 份簡報沒有被回收"
+
+
+def check_slide_rules(paths, directory):
+    """
+    投影片規則比對：結果要對（較前面的規則優先），而且長文字也要是線性時間——
+    8000 字的投影片文字比對全部內建規則須遠低於 50 ms。
+    """
+    rules = mst.SlideRules([{"pattern": "*聯合*例會*", "action": mst.SLIDE_ACTION_EXCLUDE},
+                            {"pattern": "*活動預告", "action": mst.SLIDE_ACTION_TEXT_ONLY}])
+    assert rules.action_for("三月份聯合月例會活動預告") == mst.SLIDE_ACTION_EXCLUDE
+    assert rules.action_for("例會聯合活動預告") == mst.SLIDE_ACTION_TEXT_ONLY
+    assert rules.action_for("例會聯合") == mst.SLIDE_ACTION_COPY
+
+    defaults = mst.load_slide_rules()
+    for size in (2000, 8000):
+        text = mst._normalize_text("月份聯合 例會" * (size // 6))
+        start = time.perf_counter()
+        defaults.match(text)
+        elapsed = time.perf_counter() - start
+        assert elapsed < 0.05, f"{len(text)} 字的規則比對花了 {elapsed * 1000:.1f} ms"
+
+
+def check_chart_workbooks(paths, directory):
+    """
+    三張投影片各有一張圖表，內嵌活頁簿內容完全相同；合併後（複製與移動兩種模式）
+    每張圖表仍須各有自己的活頁簿，不可被當成相同的 media 合併成一份。
+    """
+    from pptx.chart.data import CategoryChartData
+    from pptx.enum.chart import XL_CHART_TYPE
+
+    src = Presentation()
+    _textbox(src.slides.add_slide(src.slide_layouts[6]).shapes, "封面")
+    blob = None
+    for i in range(3):
+        data = CategoryChartData()
+        data.categories = ["一月", "二月"]
+        data.add_series("出席", (10, 12))
+        frame = src.slides.add_slide(src.slide_layouts[6]).shapes.add_chart(
+            XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(1), Inches(1), Inches(6), Inches(4), data)
+        xlsx_part = frame.chart.part.chart_workbook.xlsx_part
+        blob = blob or xlsx_part.blob
+        xlsx_part._blob = blob
+    deck = Path(directory) / "charts.pptx"
+    src.save(str(deck))
+
+    for move in (False, True):
+        dest = Presentation(str(paths["template"]))
+        src_prs = None if move else mst.open_source_presentation(deck)
+        try:
+            with redirect_stdout(io.StringIO()):
+                mst.insert_report_slides(dest, deck, src_prs=src_prs, move=move)
+            buf = io.BytesIO()
+            dest.save(buf)
+        finally:
+            mst.close_sources(dest)
+            if src_prs is not None:
+                src_prs.part.package.close()
+        workbooks = [shape.chart.part.chart_workbook.xlsx_part.partname
+                     for slide in Presentation(buf).slides for shape in slide.shapes if shape.has_chart]
+        assert len(workbooks) == 3 and len(set(workbooks)) == 3, f"move={move}：圖表活頁簿 {workbooks}"
+
+
+def check_pagination(paths, directory):
+    """
+    提案分頁依文字框設定：一般文字框長文字要分頁；autofit（spAutoFit／normAutofit）不分頁；
+    wrap="none" 時長行不折行，只有原本的換行會算成多行。
+    """
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+    def box(wrap, auto_size):
+        shape = _textbox(slide.shapes, "x")
+        shape.text_frame.word_wrap = wrap
+        shape.text_frame.auto_size = auto_size
+        return mst._text_box_metrics(shape, shape.text_frame._element.p_lst[0])
+
+    long_line = "說明文字" * 200
+    many_lines = "\n".join(["一行"] * 20)
+    assert len(mst.paginate_text(long_line, box(True, MSO_AUTO_SIZE.NONE))) > 1
+    for auto_size in (MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT, MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE):
+        pages = mst.paginate_text(long_line + "\n" + many_lines, box(True, auto_size))
+        assert len(pages) == 1, f"{auto_size} 的文字框不應分頁，卻分成 {len(pages)} 頁"
+    no_wrap = box(False, MSO_AUTO_SIZE.NONE)
+    assert mst.paginate_text(long_line, no_wrap) == [long_line], "wrap=none 時長行不應折行分頁"
+    pages = mst.paginate_text(many_lines, no_wrap)
+    assert len(pages) > 1 and "\n".join(pages) == many_lines, "wrap=none 時仍依原有換行分頁"
+
+
+def run_checks(paths, directory):
+    checks = [("增量重建", check_incremental), ("批次處理", check_batch), ("記憶體釋放", check_release),
+              ("投影片規則", check_slide_rules), ("圖表活頁簿", check_chart_workbooks),
+              ("提案分頁", check_pagination)]
+    for name, check in checks:
+        _clear_caches()
+        check(paths, directory)
+        print(f"  ✔ {name}")
+
+
+# ── 計時 ──────────────────────────────────────────────────────────────────────
+
+def _clear_caches():
+    mst._template_analysis_cache.clear()
+    mst._docx_model_cache.clear()
+
+
+def _measure(setup, fn, repeat, teardown=None):
+    """
+    setup() 的回傳值傳給 fn；只計 fn 的時間。每次跑完（不論成敗）以 teardown(arg) 收尾，
+    例如關閉合併進來的來源簡報 zip。回傳 (各次秒數, tracemalloc 高峰)。
+    """
+    import tracemalloc
+
+    times = []
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            _clear_caches()
+            arg = setup()
+            try:
+                t0 = time.perf_counter()
+                fn(arg)
+                times.append(time.perf_counter() - t0)
+            finally:
+                if teardown is not None:
+                    teardown(arg)
+
+        _clear_caches()
+        arg = setup()
+        tracemalloc.start()
+        try:
+            fn(arg)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            if teardown is not None:
+                teardown(arg)
+    return times, peak
+
+
+def bench_size(size, directory, repeat, shared_media=True, checks=True):
+    spec = SIZES[size]
+    paths = make_inputs(directory, size, shared_media)
+    if checks:
+        run_checks(paths, directory)
+    output = Path(directory) / f"output-{size}.pptx"
+    mapping = mst.make_mapping("2026", "1", "宣講員", "上級指導")
+
+    def open_template():
+        prs = mst.open_presentation(paths["template"])
+        return prs, mst.load_template_analysis(paths["template"], prs, cache_dir=False)
+
+    def run_replace(_):
+        mst.replace_pptx(paths["template"], mapping, output, report_path=paths["report"], doc_path=paths["doc"],
+                         proposal_path=paths["proposal"], cache_dir=False)
+
+    def close_template(a):
+        # insert_* 自行開啟的來源簡報被接進公版，zip 要等這裡才關（同 replace_pptx 存檔後）
+        mst.close_sources(a[0])
+
+    cases = [
+        # (名稱, setup, fn, teardown, 單位, 數量)
+        ("replace_pptx", lambda: None, run_replace, None, "slides", spec["n"] + 2 * spec["m"] + spec["k"]),
+        ("insert_report_slides", open_template,
+         lambda a: mst.insert_report_slides(a[0], paths["report"], template=a[1]), close_template,
+         "slides", spec["m"]),
+        ("insert_external_proposal_slides", open_template,
+         lambda a: mst.insert_external_proposal_slides(a[0], paths["proposal"], template=a[1]), close_template,
+         "slides", spec["m"]),
+        ("insert_proposal_slides", open_template,
+         lambda a: mst.insert_proposal_slides(a[0], paths["doc"], template=a[1]), close_template,
+         "proposals", spec["k"]),
+        ("parse_docx_proposals", lambda: None,
+         lambda _: mst.parse_docx_proposals(paths["doc"]), None, "proposals", spec["k"]),
+        ("extract_proposal_summary_text", lambda: None,
+         lambda _: mst.extract_proposal_summary_text(paths["doc"]), None, "proposals", spec["k"]),
+    ]
+
+    results = []
+    for name, setup, fn, teardown, unit, units in cases:
+        times, peak = _measure(setup, fn, repeat, teardown)
+        best = min(times)
+        results.append({
+            "size": size,
+            "benchmark": name,
+            "repeat": repeat,
+            "min_seconds": round(best, 6),
+            "median_seconds": round(statistics.median(times), 6),
+            "unit": unit,
+            "units": units,
+            "throughput_per_second": round(units / best, 2) if best else None,
+            "peak_traced_bytes": peak,
+        })
+        print(f"  {name:<34} {best * 1000:9.1f} ms  {units / best if best else 0:9.1f} {unit}/s"
+              f"  peak {peak / 2 ** 20:7.1f} MB")
+    return results
+
+
+def _environment():
+    import platform
+    import subprocess
+
+    import docx
+    import lxml
+    import pptx
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "python_pptx": pptx.__version__,
+        "python_docx": getattr(docx, "__version__", None),
+        "lxml": lxml.__version__,
+    }
+
+
+def compare(current, previous):
+    """印出與先前結果的比較（min_seconds 的比值，<1 表示變快）。"""
+    old = {(r["size"], r["benchmark"]): r for r in previous["results"]}
+    print(f"\n--- 與 {previous['environment'].get('git_commit') or previous['environment']['timestamp']} 比較 ---")
+    for r in current["results"]:
+        o = old.get((r["size"], r["benchmark"]))
+        if o is None or not o["min_seconds"]:
+            continue
+        ratio = r["min_seconds"] / o["min_seconds"]
+        mark = "🟢" if ratio < 0.95 else "🔴" if ratio > 1.05 else "⚪"
+        print(f"{mark} {r['size']:<7} {r['benchmark']:<34} {o['min_seconds'] * 1000:9.1f} → "
+              f"{r['min_seconds'] * 1000:9.1f} ms  ×{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="meeting_slide_tool 效能基準測試")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"], help="要測的規模")
+    parser.add_argument("--repeat", type=int, default=3, help="每項重複次數（取最小值與中位數）")
+    parser.add_argument("--unique-media", action="store_true", help="報告／提案簡報每張圖片都不同（預設共用同一張）")
+    parser.add_argument("--output", help="結果 JSON 路徑（預設 meeting_slide_bench-<時間>.json）")
+    parser.add_argument("--compare", help="選填：與先前的結果 JSON 比較")
+    parser.add_argument("--keep-inputs", help="選填：把合成輸入留在這個目錄（預設用暫存目錄）")
+    parser.add_argument("--no-checks", action="store_true", help="不做計時前的正確性檢查")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(args.keep_inputs) if args.keep_inputs else Path(tmp)
+        directory.mkdir(parents=True, exist_ok=True)
+        for size in args.sizes:
+            print(f"▶ {size}：{SIZES[size]}")
+            results.extend(bench_size(size, directory, args.repeat, shared_media=not args.unique_media,
+                                      checks=not args.no_checks))
+
+    data = {"environment": _environment(), "shared_media": not args.unique_media, "results": results}
+    output = Path(args.output or f"meeting_slide_bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"\n✅ 結果已寫入：{output}")
+
+    if args.compare:
+        compare(data, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,24 @@
 用法：
     python3 replace.py <file.pptx> --year 2024 --month 7 --speaker 張三 --supervisor 李四
     python3 replace.py <file.pptx> --year 2024 --month 7 --speaker 張三 --supervisor 李四 --report report.pptx
+    python3 replace.py <file.pptx> --batch jobs.csv --workers 4
 
 選項：
     --report <report.pptx>  把 report.pptx 第 2 張起全部複製，插入到主檔「工作報告」投影片之後
+    --batch <jobs.csv|json> 依批次清單一次產生多份（公版只解析一次）
+    --workers <N>           批次模式以 N 個 process 平行處理
+    --rules <rules.json>    提案簡報的投影片篩選規則（exclude / text_only / copy），預設用內建規則
+    --cache-dir <dir>       公版分析快取目錄（預設 ~/.cache/meeting_slide_tool，或環境變數 MEETING_SLIDE_CACHE_DIR）
+    --no-cache              不讀寫公版分析的磁碟快取
+    --incremental           沿用上次的輸出，只重建內容有變的提案投影片（只有 Word 變動時）
+    --stats <file.json|->   各階段耗時、記憶體高峰與計數（段落、投影片、media）輸出成 JSON
+    --profile               附上 cProfile 累計時間最多的函式（未指定 --stats 時印到畫面）
+    --trace-memory          以 tracemalloc 記錄各階段的 Python 記憶體高峰
     --debug                 印出所有含佔位符的 paragraph 原始 XML（診斷用）
 
+批次清單欄位：year, month, speaker, supervisor（必填），
+              report, doc, proposal, output（選填，相對於清單所在目錄）
+
 佔位符對應：
     [[Title]]     → {year}年{month}月月例會
     [[宣講員]]    → {speaker}
@@ -17,22 +30,41 @@
 """
 
 import argparse
+import re
 import sys
+import unicodedata
+import weakref
+from bisect import bisect_right
 from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path, PurePosixPath
 
 from lxml import etree
 from pptx import Presentation
 from pptx.oxml.ns import qn
-from pptx.opc.package import Part, _Relationship, RTM
-from pptx.opc.packuri import PackURI
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part, PartFactory, XmlPart, _PackageLoader, _Relationship, RTM
+from pptx.opc.packuri import PACKAGE_URI, PackURI
+from pptx.opc.serialized import PackageReader, PackageWriter
+from pptx.package import Package
 from pptx.parts.image import ImagePart
+from pptx.parts.media import MediaPart
+from pptx.parts.slide import SlideLayoutPart, SlidePart
+from pptx.util import lazyproperty
 
 A_NS    = "http://schemas.openxmlformats.org/drawingml/2006/main"
+P_NS    = "http://schemas.openxmlformats.org/presentationml/2006/main"
+R_NS    = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
 XML_NS  = "http://www.w3.org/XML/1998/namespace"
 T_TAG   = f"{{{A_NS}}}t"
+R_TAG   = f"{{{A_NS}}}r"
 RPR_TAG = f"{{{A_NS}}}rPr"
 
+W_NS       = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_BODY_TAG = f"{{{W_NS}}}body"
+W_P_TAG    = f"{{{W_NS}}}p"
+W_T_TAG    = f"{{{W_NS}}}t"
+
 # ── 文字替換 ──────────────────────────────────────────────────────────────────
 
 def _set_t_text(r_elem, text):
@@ -57,42 +89,145 @@ def _ensure_rPr(r_elem, rpr_clone):
         r_elem.remove(existing)
     r_elem.insert(0, rpr_clone)
 
-def replace_in_paragraph(paragraph, mapping, debug=False):
-    runs = paragraph.runs
-    if not runs:
-        return
-    full_text = "".join(r.text for r in runs)
-    if not any(ph in full_text for ph in mapping):
-        return
+class PlaceholderMatcher:
+    """把 mapping 編譯成單一 regex alternation，一次掃描即可找出所有佔位符。"""
+
+    __slots__ = ("mapping", "regex", "xpath")
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        # 長的鍵放前面，避免較短的鍵先吃掉較長佔位符的一部分
+        keys = sorted((k for k in self.mapping if k), key=len, reverse=True)
+        self.regex = re.compile("|".join(re.escape(k) for k in keys)) if keys else None
+        self.xpath = _prefilter_xpath(keys) if keys else None
+
+
+def _xpath_literal(s):
+    if "'" not in s:
+        return f"'{s}'"
+    if '"' not in s:
+        return f'"{s}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in s.split("'")) + ")"
+
+
+def _prefilter_xpath(keys):
+    """
+    只挑出文字含佔位符開頭（例如 [[、{{）的 <a:p>；以段落的字串值比對，
+    開頭被拆在兩個 run 也找得到。只看 p:txBody，與 has_text_frame 的範圍一致。
+    """
+    openers = sorted({k[:2] for k in keys})
+    cond = " or ".join(f"contains(., {_xpath_literal(o)})" for o in openers)
+    return etree.XPath(f".//p:txBody/a:p[{cond}]", namespaces={"a": A_NS, "p": P_NS})
+
+
+def compile_mapping(mapping):
+    if isinstance(mapping, PlaceholderMatcher):
+        return mapping
+    return PlaceholderMatcher(mapping)
+
+
+def _has_sz(r_elem):
+    rpr = r_elem.find(RPR_TAG)
+    return rpr is not None and rpr.get("sz") is not None
+
+
+def replace_in_p(p_elem, mapping, debug=False):
+    """
+    在 <a:p> 中一次掃描替換所有佔位符，只改寫被命中的 run。
+
+    - 佔位符落在單一 run 內：就地替換，保留該 run 的格式
+    - 佔位符跨 run：替換值放進第一個被命中的 run，其餘被命中的部分清空；
+      若第一個 run 沒有字級而後面被命中的 run 有，沿用後者的 rPr
+    回傳是否有替換。
+    """
+    matcher = compile_mapping(mapping)
+    if matcher.regex is None:
+        return False
+    _count("paragraphs_scanned")
+    r_elems = p_elem.findall(R_TAG)
+    if not r_elems:
+        return False
+    texts = []
+    for r in r_elems:
+        t = r.find(T_TAG)
+        texts.append((t.text or "") if t is not None else "")
+    full_text = "".join(texts)
+    matches = list(matcher.regex.finditer(full_text))
+    if not matches:
+        return False
     if debug:
-        print(f"\n[DEBUG] before:\n{etree.tostring(paragraph._p, pretty_print=True).decode()}")
-
-    all_in_single = all(any(ph in r.text for r in runs) for ph in mapping if ph in full_text)
-    if all_in_single:
-        for run in runs:
-            new = run.text
-            for ph, val in mapping.items():
-                new = new.replace(ph, val)
-            if new != run.text:
-                _set_t_text(run._r, new)
-    else:
-        new_text = full_text
-        for ph, val in mapping.items():
-            new_text = new_text.replace(ph, val)
-        def has_sz(run):
-            rpr = run._r.find(RPR_TAG)
-            return rpr is not None and rpr.get("sz") is not None
-        target_run = next((r for r in runs if has_sz(r)), runs[0])
-        target_rpr = _clone_rPr(target_run._r)
-        for run in runs:
-            _set_t_text(run._r, "")
-        _set_t_text(runs[0]._r, new_text)
-        _ensure_rPr(runs[0]._r, target_rpr)
+        print(f"\n[DEBUG] before:\n{etree.tostring(p_elem, pretty_print=True).decode()}")
+
+    starts = []
+    pos = 0
+    for text in texts:
+        starts.append(pos)
+        pos += len(text)
+
+    pieces = [[] for _ in r_elems]
+    touched = set()
+    spanning = []
+
+    def emit(a, b):
+        # 把 full_text[a:b] 依原本所屬的 run 放回去
+        i = bisect_right(starts, a) - 1
+        while a < b:
+            while not texts[i]:
+                i += 1
+            run_end = starts[i] + len(texts[i])
+            cut = min(b, run_end)
+            pieces[i].append(full_text[a:cut])
+            a = cut
+            i += 1
+
+    cursor = 0
+    for m in matches:
+        emit(cursor, m.start())
+        first = bisect_right(starts, m.start()) - 1
+        while not texts[first]:
+            first += 1
+        last = bisect_right(starts, m.end() - 1) - 1
+        pieces[first].append(matcher.mapping[m.group()])
+        touched.update(range(first, last + 1))
+        if last != first:
+            spanning.append((first, last))
+        cursor = m.end()
+    emit(cursor, len(full_text))
+
+    for first, last in spanning:
+        if _has_sz(r_elems[first]):
+            continue
+        src = next((r_elems[i] for i in range(first + 1, last + 1) if _has_sz(r_elems[i])), None)
+        if src is not None:
+            _ensure_rPr(r_elems[first], _clone_rPr(src))
+
+    for i in sorted(touched):
+        new = "".join(pieces[i])
+        if new != texts[i]:
+            _set_t_text(r_elems[i], new)
 
     if debug:
-        print(f"[DEBUG] after:\n{etree.tostring(paragraph._p, pretty_print=True).decode()}")
+        print(f"[DEBUG] after:\n{etree.tostring(p_elem, pretty_print=True).decode()}")
+    _count("paragraphs_replaced")
+    return True
+
+
+def replace_in_paragraph(paragraph, mapping, debug=False):
+    return replace_in_p(paragraph._p, mapping, debug)
+
+
+def replace_in_element(root, mapping, debug=False):
+    """
+    以一次 XPath 預先篩出可能含佔位符的段落，只對這些段落做替換；
+    其餘 shape 不經過 python-pptx 的物件模型。回傳替換的段落數。
+    """
+    matcher = compile_mapping(mapping)
+    if matcher.xpath is None:
+        return 0
+    return sum(1 for p_elem in matcher.xpath(root) if replace_in_p(p_elem, matcher, debug))
 
 def process_shape(shape, mapping, debug=False):
+    mapping = compile_mapping(mapping)
     if shape.shape_type == 6:
         for s in shape.shapes:
             process_shape(s, mapping, debug)
@@ -105,161 +240,801 @@ def process_shape(shape, mapping, debug=False):
 
 # ── Word 提案解析與插入 ────────────────────────────────────────────────────────
 
-def parse_docx_proposals(doc_path):
+def iter_docx_paragraphs(doc_path):
+    """
+    以 iterparse 逐段讀出 Word 本文（w:body 直屬的 w:p）的文字，不整份載入。
+
+    處理過的段落與其前面的兄弟節點（表格等）會立即釋放；
+    呼叫端 break 後 generator 關閉，zip 與 XML 不會再往下讀。
+    """
     import zipfile
-    import xml.etree.ElementTree as ET
-    
-    items = []
-    try:
-        with zipfile.ZipFile(str(doc_path), 'r') as z:
-            content = z.read('word/document.xml')
-            root = ET.fromstring(content)
-            namespaces = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-            
-            body = root.find(f".//{{{namespaces['w']}}}body")
-            
-            paragraphs = []
-            if body is not None:
-                for child in body:
-                    if child.tag == f"{{{namespaces['w']}}}p":
-                        text = ''.join(t.text for t in child.findall('.//w:t', namespaces) if t.text)
-                        if text.strip():
-                            paragraphs.append(text.strip())
-
-            in_section = False
-            current_item = None
-            
-            for text in paragraphs:
-                if '宣讀上次決議案執行成效' in text:
-                    in_section = True
+
+    with zipfile.ZipFile(str(doc_path), 'r') as z:
+        with z.open('word/document.xml') as f:
+            for _, elem in etree.iterparse(f, events=("end",), tag=W_P_TAG):
+                parent = elem.getparent()
+                if parent is None or parent.tag != W_BODY_TAG:
                     continue
-                
-                if in_section:
-                    if text.startswith('【提案') and '】' in text:
-                        if current_item:
-                            items.append(current_item)
-                        current_item = {'projectNumber': text, 'AA': '', 'BB': ''}
-                    elif current_item:
-                        stripped_text = text.replace(' ', '').replace('　', '')
-                        if stripped_text.startswith('案由：') or stripped_text.startswith('案由:'):
-                            sep = '：' if '：' in text else ':'
-                            current_item['AA'] = text.split(sep, 1)[1].strip() if sep in text else text
-                        elif stripped_text.startswith('執行成效：') or stripped_text.startswith('執行成效:') or stripped_text.startswith('執行辦法：') or stripped_text.startswith('執行辦法:'):
-                            sep = '：' if '：' in text else ':'
-                            current_item['BB'] = text.split(sep, 1)[1].strip() if sep in text else text
-                        elif '工作報告' in text or '提案討論' in text:
-                            break
-                        elif current_item['BB'] != '':
-                            current_item['BB'] += '\n' + text
-                        elif current_item['AA'] != '':
-                            current_item['AA'] += '\n' + text
-            if current_item:
-                items.append(current_item)
+                text = ''.join(t.text for t in elem.iter(W_T_TAG) if t.text)
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+                yield text
+
+
+def _file_digest(path):
+    import hashlib
+
+    h = hashlib.sha256()
+    with open(str(path), "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+EFFECT_SECTION = "宣讀上次決議案執行成效"
+DISCUSSION_SECTIONS = ["總會提案討論", "別院提案討論"]
+SECTION_END_KEYWORDS = ["工作報告", "提案討論"]
+DOC_STOP_KEYWORD = "各類宣導"
+DISCUSSION_AA_END = ["說明", "討論", "辦法"]
+
+_FIELD_LABELS = {
+    "AA": ("案由：", "案由:"),
+    "BB": ("執行成效：", "執行成效:", "執行辦法：", "執行辦法:"),
+}
+
+# 內容 hash → 解析結果；同一份 Word 在同一個 session 只解析一次
+_docx_model_cache: dict[str, dict] = {}
+_DOCX_MODEL_CACHE_SIZE = 8
+
+
+def _match_field(text):
+    """判斷段落是否為「案由：」「執行成效：」等欄位開頭，回傳 (欄位, 標籤, 內容)。"""
+    stripped = text.replace(' ', '').replace('　', '')
+    for field, labels in _FIELD_LABELS.items():
+        if stripped.startswith(labels):
+            sep = '：' if '：' in text else ':'
+            if sep not in text:
+                return field, "", text
+            label, value = text.split(sep, 1)
+            return field, label + sep, value.strip()
+    return None
+
+
+def _build_docx_model(paragraphs):
+    sections = []
+    section = None
+    item = None
+    last_field = None
+
+    for text in paragraphs:
+        title = EFFECT_SECTION if EFFECT_SECTION in text else next(
+            (t for t in DISCUSSION_SECTIONS if t in text), None)
+        if title is not None:
+            section = {"title": title,
+                       "kind": "effect" if title == EFFECT_SECTION else "discussion",
+                       "proposals": []}
+            sections.append(section)
+            item, last_field = None, None
+            continue
+        if DOC_STOP_KEYWORD in text:
+            break
+        if section is None:
+            continue
+
+        if text.startswith('【提案') and '】' in text:
+            item = {"projectNumber": text, "AA": "", "BB": "", "AA_label": "", "BB_label": "",
+                    "AA_text": "", "BB_text": ""}
+            section["proposals"].append(item)
+            last_field = None
+            continue
+        if item is None:
+            continue
+
+        field = _match_field(text)
+        if field is not None and (section["kind"] == "effect" or field[0] == "AA"):
+            name, label, value = field
+            item[name], item[f"{name}_label"], item[f"{name}_text"] = value, label, text
+            last_field = name
+        elif any(k in text for k in SECTION_END_KEYWORDS):
+            section, item, last_field = None, None, None
+        elif section["kind"] == "discussion":
+            # 討論案只取案由（到「說明／討論／辦法」為止）
+            if last_field == "AA" and any(k in text.replace(' ', '').replace('　', '') for k in DISCUSSION_AA_END):
+                last_field = None
+            elif last_field == "AA":
+                item["AA"] += '\n' + text
+                item["AA_text"] += '\n' + text
+        elif last_field is not None:
+            item[last_field] += '\n' + text
+            item[f"{last_field}_text"] += '\n' + text
+
+    return {"sections": sections}
+
+
+def parse_meeting_docx(doc_path):
+    """
+    解析會議紀錄 Word 檔，回傳結構化的提案資料（以檔案內容 hash 快取）：
+
+        {"sections": [{"title": ..., "kind": "effect" | "discussion",
+                       "proposals": [{"projectNumber", "AA", "BB", "AA_label", "BB_label", "AA_text", "BB_text"}]}]}
+
+    AA / BB 為去掉標籤後的內容（投影片用）；AA_text / BB_text 為 Word 原文各行（摘要用，保留原本的空白）。
+
+    effect 為「宣讀上次決議案執行成效」，discussion 為總會／別院提案討論。
+    回傳的物件為快取共用，呼叫端不要修改。
+    """
+    key = _file_digest(doc_path)
+    model = _docx_model_cache.get(key)
+    if model is None:
+        paragraphs = (text.strip() for text in iter_docx_paragraphs(doc_path) if text.strip())
+        model = _build_docx_model(paragraphs)
+        if len(_docx_model_cache) >= _DOCX_MODEL_CACHE_SIZE:
+            _docx_model_cache.pop(next(iter(_docx_model_cache)))
+        _docx_model_cache[key] = model
+    return model
+
+
+def parse_docx_proposals(doc_path):
+    """回傳「宣讀上次決議案執行成效」的提案 list（projectNumber / AA / BB）。"""
+    try:
+        model = parse_meeting_docx(doc_path)
     except Exception as e:
         print(f"⚠️ 讀取 Word 檔案 {doc_path} 失敗: {e}", file=sys.stderr)
-        
-    return items
+        return []
+    return [item for sec in model["sections"] if sec["kind"] == "effect" for item in sec["proposals"]]
 
-def move_slide_to(prs, slide_to_move, insert_index):
-    from pptx.oxml.ns import qn
-    prs_elm = prs.part._element
-    sldIdLst = prs_elm.find(qn("p:sldIdLst"))
-    
-    slide_id = slide_to_move.slide_id
-    all_sldIds = list(sldIdLst.findall(qn("p:sldId")))
-    
-    target_el = next((el for el in all_sldIds if int(el.get("id")) == slide_id), None)
-    if target_el is not None:
-        sldIdLst.remove(target_el)
-        all_sldIds_now = list(sldIdLst.findall(qn("p:sldId")))
-        if insert_index < len(all_sldIds_now):
-            all_sldIds_now[insert_index].addprevious(target_el)
+PROPOSAL_LAYOUT_INDEX = 4
+PROPOSAL_KEYS = ["{{ProjectNumber}}", "{{project}}", "{{work}}", "{{project_title}}", "{{work_title}}"]
+EFFECT_ANCHOR_KEYWORDS = ["決議案執行成效", "決議執行成效"]
+
+
+def _element_path(root, elem):
+    """elem 相對於 root 的子節點索引路徑，可存進 JSON 之後再用 _resolve_path 找回。"""
+    path = []
+    while elem is not root:
+        parent = elem.getparent()
+        path.append(parent.index(elem))
+        elem = parent
+    return path[::-1]
+
+
+def _resolve_path(root, path):
+    for i in path:
+        root = root[i]
+    return root
+
+
+def _prepare_proposal_layout(layout):
+    """
+    從提案版面（母片第 5 張）整理出建立提案投影片需要的資料（皆為可序列化的 XML 字串／路徑）：
+
+    - non_placeholders：含 {{...}} 的非佔位符文字方塊，要複製到每張提案投影片
+    - placeholder_paragraphs：含 {{...}} 的佔位符 idx → 其段落，要填到投影片同 idx 的佔位符
+    - blank_paths：版面上整段只有 {{...}} 的段落，要在版面上清空（避免與投影片疊字）
+    """
+    layout_elem = layout.part._element
+    non_placeholders = []
+    placeholder_paragraphs = {}
+    blank_paths = []
+    for l_shape in layout.shapes:
+        if not getattr(l_shape, "has_text_frame", False):
+            continue
+        if not any(k in l_shape.text for k in PROPOSAL_KEYS):
+            continue
+        if getattr(l_shape, "is_placeholder", False):
+            placeholder_paragraphs[str(l_shape.placeholder_format.idx)] = [
+                etree.tostring(p, encoding="unicode") for p in l_shape.text_frame._element.p_lst
+            ]
         else:
-            sldIdLst.append(target_el)
+            non_placeholders.append(etree.tostring(l_shape._element, encoding="unicode"))
+            for p in l_shape.text_frame.paragraphs:
+                if "".join(r.text for r in p.runs) in PROPOSAL_KEYS:
+                    blank_paths.append(_element_path(layout_elem, p._p))
+    return {
+        "non_placeholders": non_placeholders,
+        "placeholder_paragraphs": placeholder_paragraphs,
+        "blank_paths": blank_paths,
+    }
+
+
+def _clone_proposal_layout(prs, layout, blank_paths):
+    """
+    複製一份提案專用的版面，把整段只有 {{...}} 的段落清空（保留「案由」等固定文字），
+    避免版面上的變數與投影片上的內容疊字；原本的版面完全不動。
+    """
+    src = layout.part
+    package = src.package
+    elem = deepcopy(src._element)
+    for path in blank_paths:
+        for r in _resolve_path(elem, path).findall(R_TAG):
+            _set_t_text(r, "")
+    cSld = elem.find(qn("p:cSld"))
+    if cSld is not None:
+        cSld.set("name", f"{cSld.get('name') or layout.name}（提案）")
+
+    part = SlideLayoutPart(package.next_partname("/ppt/slideLayouts/slideLayout%d.xml"),
+                           src.content_type, package, elem)
+    for rId, rel in src.rels.items():
+        _set_rel(part, rId, rel.reltype, rel._target, is_external=rel.is_external)
+
+    master = layout.slide_master
+    rId = master.part.relate_to(part, RT.SLIDE_LAYOUT)
+    used_ids = [int(x) for x in prs.part._element.xpath("./p:sldMasterIdLst/p:sldMasterId/@id")]
+    for m in prs.slide_masters:
+        used_ids += [int(x) for x in m._element.xpath("./p:sldLayoutIdLst/p:sldLayoutId/@id")]
+    etree.SubElement(master._element.get_or_add_sldLayoutIdLst(), qn("p:sldLayoutId"),
+                     {"id": str(max(used_ids) + 1), qn("r:id"): rId})
+    return part.slide_layout
+
+
+PROPOSAL_FIXED_MAPPING = {
+    "{{project_title}}": "案        由：",
+    "{{work_title}}": "執行成效：",
+}
+
+EMU_PER_PT = 12700
+DEFAULT_SZ = 1800          # 找不到字級時視為 18pt
+LINE_SPACING = 1.2         # 行高 ≈ 字級 × 1.2
+NARROW_CHAR_EM = 0.55      # 半形字元寬度約為全形的一半
+
+
+def _paragraph_sz(p, txBody):
+    """段落字級（百分之一點）：run 的 rPr sz → endParaRPr → lstStyle 第一層 → 預設。"""
+    for rpr in p.iter(RPR_TAG, qn("a:endParaRPr")):
+        if rpr.get("sz"):
+            return int(rpr.get("sz"))
+    lvl1 = txBody.find(f"{qn('a:lstStyle')}/{qn('a:lvl1pPr')}/{qn('a:defRPr')}")
+    if lvl1 is not None and lvl1.get("sz"):
+        return int(lvl1.get("sz"))
+    return DEFAULT_SZ
+
+
+_AUTOFIT_TAGS = (qn("a:noAutofit"), qn("a:normAutofit"), qn("a:spAutoFit"))
+
 
-def insert_proposal_slides(prs, doc_path, debug=False):
+def _body_pr_chain(shape):
+    """文字框自己的 bodyPr，接著是（佔位符時）版面、母片上對應佔位符的 bodyPr。"""
+    while shape is not None:
+        bodyPr = shape.text_frame._element.find(qn("a:bodyPr"))
+        if bodyPr is not None:
+            yield bodyPr
+        shape = getattr(shape, "_base_placeholder", None)
+
+
+def _text_box_metrics(shape, p):
+    """
+    文字框扣掉內距後可用的寬高（EMU）、段落字級，以及是否自動換行（wrap）、
+    是否自動調整大小（autofit：文字放大框或縮小字，不會溢出，不必分頁）。
+    """
+    txBody = shape.text_frame._element
+    chain = list(_body_pr_chain(shape))
+    bodyPr = chain[0] if chain else None
+    def inset(name, default):
+        v = bodyPr.get(name) if bodyPr is not None else None
+        return int(v) if v is not None else default
+    width = shape.width - inset("lIns", 91440) - inset("rIns", 91440)
+    height = shape.height - inset("tIns", 45720) - inset("bIns", 45720)
+    wrap = next((b.get("wrap") for b in chain if b.get("wrap")), "square")
+    fit = next((child.tag for b in chain for child in b if child.tag in _AUTOFIT_TAGS), None)
+    return {"width": max(width, 1), "height": max(height, 1), "sz": _paragraph_sz(p, txBody),
+            "wrap": wrap != "none", "autofit": fit in (qn("a:normAutofit"), qn("a:spAutoFit"))}
+
+
+@lru_cache(maxsize=None)
+def _char_em(ch):
+    """字元寬度（以字級為 1 em）：全形／中日韓文字 1，其餘約 0.55。"""
+    return 1.0 if unicodedata.east_asian_width(ch) in ("W", "F") else NARROW_CHAR_EM
+
+
+@lru_cache(maxsize=4096)
+def _wrap_line(line, sz, width):
+    """把一行文字依框寬折成多行，回傳各段文字。"""
+    limit = width / (sz / 100 * EMU_PER_PT)   # 一行可容納的 em 數
+    segments = []
+    start, used = 0, 0.0
+    for i, ch in enumerate(line):
+        w = _char_em(ch)
+        if used + w > limit and i > start:
+            segments.append(line[start:i])
+            start, used = i, 0.0
+        used += w
+    segments.append(line[start:])
+    return tuple(segments)
+
+
+def paginate_text(text, box):
+    """
+    依文字框大小把 text 分成數頁，每頁不超過框高可容納的行數。
+    同一行被拆到兩頁時不加換行；回傳各頁文字的 list（至少一頁）。
+    文字框設為自動調整大小時不分頁；不自動換行（wrap="none"）時只以原有的換行計算行數。
+    """
+    if not text or box.get("autofit"):
+        return [text]
+    line_height = box["sz"] / 100 * EMU_PER_PT * LINE_SPACING
+    lines_per_page = max(1, int(box["height"] // line_height))
+
+    pages, page, count = [], [], 0
+    for line in text.split("\n"):
+        segments = _wrap_line(line, box["sz"], box["width"]) if box.get("wrap", True) else (line,)
+        for n, segment in enumerate(segments):
+            if count == lines_per_page:
+                pages.append(page)
+                page, count = [], 0
+            if n > 0 and page:
+                page[-1] += segment
+            else:
+                page.append(segment)
+            count += 1
+    pages.append(page)
+    return ["\n".join(pg) for pg in pages]
+
+
+def _build_proposal_prototype(layout, prepared):
+    """
+    建立一份已備妥的提案投影片原型（整個流程只做一次）：
+    佔位符填入版面上的 {{...}} 段落、加上非佔位符文字方塊、固定標題先填好。
+    回傳 (原型 <p:sld>, 各提案要填的段落路徑)。
+    """
+    package = layout.part.package
+    proto_part = SlidePart.new(PackURI("/ppt/slides/proposalPrototype.xml"), package, layout.part)
+    proto = proto_part.slide
+    proto.shapes.clone_layout_placeholders(layout)
+
+    # 將 layout 中 placeholders 的預設文字完整複製到原型上，否則 python-pptx 預設會是空的，導致無法取代
+    for idx, paragraphs in prepared["placeholder_paragraphs"].items():
+        try:
+            s_shape = proto.placeholders[int(idx)]
+            if not s_shape.text.strip():
+                s_shape.text_frame._element.clear_content()
+                for x in paragraphs:
+                    s_shape.text_frame._element.append(etree.fromstring(x))
+        except Exception:
+            pass
+
+    # 將預先抽出的非佔位符模板拷貝至原型
+    for x in prepared["non_placeholders"]:
+        proto.shapes._spTree.append(etree.fromstring(x))
+
+    elem = proto_part._element
+    replace_in_element(elem, PROPOSAL_FIXED_MAPPING)
+    variable_keys = [k for k in PROPOSAL_KEYS if k not in PROPOSAL_FIXED_MAPPING]
+    finder = compile_mapping({k: "" for k in variable_keys}).xpath
+    fill_paths = [_element_path(elem, p) for p in finder(elem)
+                  if any(k in "".join(p.itertext()) for k in variable_keys)]
+
+    # 記錄「案由」「執行成效」文字框的大小與字級，供分頁估算
+    boxes = {}
+    for shape in proto.shapes:
+        if not shape.has_text_frame or shape.width is None or shape.height is None:
+            continue
+        for p in shape.text_frame._element.p_lst:
+            text = "".join(p.itertext())
+            for key in ("{{project}}", "{{work}}"):
+                if key in text and key not in boxes:
+                    boxes[key] = _text_box_metrics(shape, p)
+    return elem, fill_paths, boxes
+
+
+def _add_slide_from_xml(prs, layout, elem):
+    """以現成的 <p:sld> 直接建立新投影片，不經 add_slide 逐一複製版面佔位符。"""
+    pres_part = prs.part
+    slide_part = SlidePart(pres_part._next_slide_partname, CT.PML_SLIDE, pres_part.package, elem)
+    slide_part.relate_to(layout.part, RT.SLIDE_LAYOUT)
+    rId = pres_part.relate_to(slide_part, RT.SLIDE)
+    prs.slides._sldIdLst.add_sldId(rId)
+    return slide_part.slide
+
+
+def _proposal_hash(item, paginate=True):
+    import hashlib
+    import json
+
+    data = [item['projectNumber'], item['AA'], item['BB'], bool(paginate)]
+    return hashlib.sha1(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _prepare_proposal_rendering(prs, template=None, layout=None):
+    """
+    準備建立提案投影片所需的版面與原型；回傳 dict，找不到提案版面時回傳 None。
+    layout 有給時直接使用（例如沿用上次輸出中已清空變數的提案版面）。
+    """
+    reuse = layout is not None
+    if not reuse:
+        try:
+            # 取得母片第 5 張 (index 4)
+            layout = prs.slide_layouts[PROPOSAL_LAYOUT_INDEX]
+        except IndexError:
+            print("⚠️ 找不到母片的第 5 張投影片版面配置，無法插入提案投影片。", file=sys.stderr)
+            return None
+
+    # 沿用的提案版面變數已被清空，此時必須由公版分析提供段落內容
+    prepared = template.get("proposal_layout") if template else None
+    if prepared is None:
+        prepared = _prepare_proposal_layout(layout)
+    if not reuse and prepared["blank_paths"]:
+        layout = _clone_proposal_layout(prs, layout, prepared["blank_paths"])
+
+    proto, fill_paths, boxes = _build_proposal_prototype(layout, prepared)
+    return {"layout": layout, "proto": proto, "fill_paths": fill_paths, "boxes": boxes}
+
+
+def _render_proposal(prs, rendering, item, paginate=True, debug=False):
+    """以原型建立一個提案的投影片（內容過長時含續頁），回傳新投影片的 slide id list。"""
+    boxes = rendering["boxes"]
+    aa_pages = paginate_text(item['AA'], boxes["{{project}}"]) if paginate and "{{project}}" in boxes else [item['AA']]
+    bb_pages = paginate_text(item['BB'], boxes["{{work}}"]) if paginate and "{{work}}" in boxes else [item['BB']]
+    n_pages = max(len(aa_pages), len(bb_pages))
+    if n_pages > 1:
+        print(f"   📄 {item['projectNumber']} 內容較長，分成 {n_pages} 張")
+
+    slide_ids = []
+    for page in range(n_pages):
+        mapping = compile_mapping({
+            "{{ProjectNumber}}": item['projectNumber'] + ("（續）" if page else ""),
+            "{{project}}": aa_pages[page] if page < len(aa_pages) else "",
+            "{{work}}": bb_pages[page] if page < len(bb_pages) else "",
+        })
+        elem = deepcopy(rendering["proto"])
+        for path in rendering["fill_paths"]:
+            replace_in_p(_resolve_path(elem, path), mapping, debug)
+        slide_ids.append(_add_slide_from_xml(prs, rendering["layout"], elem).slide_id)
+    _count("proposal_slides", len(slide_ids))
+    return slide_ids
+
+
+def insert_proposal_slides(prs, doc_path, debug=False, plan=None, template=None, paginate=True):
+    """
+    依 Word 的「宣讀上次決議案執行成效」建立提案投影片，插在「決議案執行成效」之後。
+    回傳 {"layout": 提案版面 partname, "proposals": [{"hash", "slide_ids"}]}（沒有建立時為 None）。
+    """
     items = parse_docx_proposals(doc_path)
     if not items:
-        return
-        
-    try:
-        # 取得母片第 5 張 (index 4)
-        layout = prs.slide_layouts[4]
-    except IndexError:
-        print("⚠️ 找不到母片的第 5 張投影片版面配置，無法插入提案投影片。", file=sys.stderr)
-        return
-        
-    # Find insertion point
-    keyword1 = "決議案執行成效"
-    keyword2 = "決議執行成效"
-    insert_idx = len(prs.slides) - 1
-    for i, slide_obj in enumerate(prs.slides):
-        text = "\n".join(shape.text for shape in slide_obj.shapes if shape.has_text_frame)
-        if keyword1 in text or keyword2 in text:
-            insert_idx = i
-            break
+        return None
+
+    rendering = _prepare_proposal_rendering(prs, template)
+    if rendering is None:
+        return None
+
+    own_plan = plan is None
+    if own_plan:
+        plan = SlideOrderPlan(prs)
+
+    # Find insertion point（找不到就放到最後）
+    ordered = plan.ordered_slides()
+    anchor_idx = _find_slide(prs, ordered, EFFECT_ANCHOR_KEYWORDS, template)
+    group = plan.add_group(ordered[anchor_idx].slide_id if anchor_idx is not None else None)
 
     print(f"📋 從「{doc_path.name}」建立 {len(items)} 張提案投影片...")
-    
-    from copy import deepcopy
-    template_non_placeholders = []
-    mapping_keys = ["{{ProjectNumber}}", "{{project}}", "{{work}}", "{{project_title}}", "{{work_title}}"]
-    
-    # 預先把非佔位符的模板圖案抽出來，然後唯獨把母片上的變數清除成空字串，以確保「案由」等固定文字會被保留在母片供調整，且不會有疊字問題
-    for l_shape in layout.shapes:
-        print(l_shape.text)
-        if not getattr(l_shape, "is_placeholder", False) and getattr(l_shape, "has_text_frame", False):
-           
-            if any(k in l_shape.text for k in mapping_keys):
-                template_non_placeholders.append(deepcopy(l_shape._element))
-                for p in l_shape.text_frame.paragraphs:
-                    print("  x" + p.text)
-                    full_text = "".join(r.text for r in p.runs)
-                    if full_text in mapping_keys:
-                        for run in p.runs:
-                            print("    y" + run.text)
-                            run.text = run.text.replace(run.text, "")
-                    #for run in p.runs:
-                    #    print("    y" + run.text)
-                    #    for k in mapping_keys:
-                    #        if k in run.text:
-                    #            run.text = run.text.replace(k, "")
-                
-    for offset, item in enumerate(items):
-        slide = prs.slides.add_slide(layout)
-        
-        mapping = {
-            "{{ProjectNumber}}": item['projectNumber'],
-            "{{project_title}}": "案        由：",
-            "{{project}}": item['AA'],
-            "{{work_title}}": "執行成效：",
-            "{{work}}": item['BB']
-        }
 
-        # 將 layout 中 placeholders 的預設文字完整複製到 slide 上，否則 python-pptx 預設會是空的，導致無法取代
-        for l_shape in layout.shapes:
-            if getattr(l_shape, "is_placeholder", False) and l_shape.has_text_frame:
-                if any(k in l_shape.text for k in mapping_keys):
-                    try:
-                        s_shape = slide.placeholders[l_shape.placeholder_format.idx]
-                        if not s_shape.text.strip():
-                            s_shape.text_frame._element.clear_content()
-                            for p in l_shape.text_frame._element.p_lst:
-                                s_shape.text_frame._element.append(deepcopy(p))
-                    except Exception:
-                        pass
-                        
-        # 將預先抽出的非佔位符模板拷貝至此張投影片
-        for sp_el in template_non_placeholders:
-            slide.shapes._spTree.append(deepcopy(sp_el))
-
-        for shape in slide.shapes:
-            process_shape(shape, mapping, debug=debug)
-            
-        target_idx = insert_idx + 1 + offset
-        move_slide_to(prs, slide, target_idx)
-        
-    print(f"   ✅ 建立提案投影片完成（共 {len(items)} 張）")
+    # 每張提案投影片 = 複製原型 + 直接填入幾個已知段落
+    proposals = []
+    for item in items:
+        slide_ids = _render_proposal(prs, rendering, item, paginate, debug)
+        group.extend(slide_ids)
+        proposals.append({"hash": _proposal_hash(item, paginate), "slide_ids": slide_ids})
+
+    if own_plan:
+        plan.apply()
+    print(f"   ✅ 建立提案投影片完成（共 {len(items)} 案，{len(group)} 張）")
+    return {"layout": str(rendering["layout"].part.partname), "proposals": proposals}
+
+
+# ── 開檔／存檔 ────────────────────────────────────────────────────────────────
+# prs.save() 會把每個 part 的 blob 重新壓縮寫出，影音檔很大時既慢又吃記憶體。
+# 開檔時記下每個二進位 part 來自哪個 zip entry，存檔時若 blob 沒換、來源檔也沒變，
+# 就把壓縮後的資料原封不動搬到輸出 zip；XML part 與其他 part 照常序列化。
+#
+# 報告／提案等來源簡報大多數投影片不會被複製，用 open_source_presentation 開啟：
+# 只先讀 XML，圖片影音保留為 zip entry 的參照，真正複製到的才讀進記憶體。
+
+_part_sources = weakref.WeakKeyDictionary()
+
+
+def _file_stamp(path):
+    import os
+
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _track_part_sources(prs, path, stamp=None):
+    """
+    記錄 prs 中二進位 part 的來源 (zip 路徑, 檔案戳記, entry 名稱, blob)。
+    prs 是由先前讀出的內容開啟時，stamp 應為讀取當時的 _file_stamp(path)。
+    """
+    import os
+
+    path = os.path.abspath(str(path))
+    if stamp is None:
+        stamp = _file_stamp(path)
+    for part in prs.part.package.iter_parts():
+        if not isinstance(part, XmlPart):
+            # 直接取 __dict__，不觸發延遲載入的 part 去讀 blob
+            _part_sources[part] = (path, stamp, part.partname.membername, part.__dict__.get("_blob"))
+
+
+def open_presentation(path):
+    """開啟 .pptx 並記錄二進位 part 的來源，供 save_presentation 直接搬移。"""
+    prs = Presentation(str(path))
+    _track_part_sources(prs, path)
+    return prs
+
+
+class _ZipEntryRef:
+    """尚未讀取的 zip entry；len() 為解壓後大小。"""
+
+    __slots__ = ("zip", "name", "size")
+
+    def __init__(self, zf, name):
+        self.zip = zf
+        self.name = name
+        self.size = zf.getinfo(name).file_size
+
+    def __len__(self):
+        return self.size
+
+    def read(self):
+        return self.zip.read(self.name)
+
+    def sha1(self):
+        """串流計算解壓後內容的 sha1，不把整個 entry 讀進記憶體。"""
+        import hashlib
+
+        h = hashlib.sha1()
+        with self.zip.open(self.name) as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.digest()
+
+
+def _peek_blob(part):
+    """part 的 blob；延遲載入尚未讀取時回傳 _ZipEntryRef（可 len()），不觸發讀取。"""
+    return part.__dict__.get("_blob")
+
+
+class _LazyBlobMixin:
+    """_blob 為 _ZipEntryRef 時，第一次存取才從 zip 讀出並留下。"""
+
+    @property
+    def _blob(self):
+        blob = self.__dict__.get("_blob")
+        if isinstance(blob, _ZipEntryRef):
+            ref, blob = blob, blob.read()
+            self.__dict__["_blob"] = blob
+            self.__dict__["_blob_ref"] = ref
+            src = _part_sources.get(self)
+            if src is not None and src[3] is ref:
+                _part_sources[self] = src[:3] + (blob,)
+        return blob
+
+    @_blob.setter
+    def _blob(self, value):
+        self.__dict__["_blob"] = value
+
+
+def _unload_blob(part):
+    """
+    把延遲載入後讀出的 blob 換回 zip entry 參照，釋放記憶體；
+    只在 blob 沒被換過時才做，save_presentation 仍可原封搬移。成功回傳 True。
+    """
+    ref = part.__dict__.get("_blob_ref")
+    src = _part_sources.get(part)
+    if ref is None or src is None or src[3] is not part.__dict__.get("_blob"):
+        return False
+    part.__dict__["_blob"] = ref
+    _part_sources[part] = src[:3] + (ref,)
+    return True
+
+
+@lru_cache(maxsize=None)
+def _lazy_part_class(cls):
+    return type(f"Lazy{cls.__name__}", (_LazyBlobMixin, cls), {})
+
+
+class _ZipMembers:
+    """依 PackURI 逐一讀取 zip entry（python-pptx 原本的 reader 會一次讀進整個 zip）。"""
+
+    def __init__(self, zf):
+        self.zip = zf
+
+    def __contains__(self, pack_uri):
+        return isinstance(pack_uri, PackURI) and pack_uri.membername in self.zip.NameToInfo
+
+    def __getitem__(self, pack_uri):
+        if pack_uri not in self:
+            raise KeyError(f"no member '{pack_uri}' in package")
+        return self.zip.read(pack_uri.membername)
+
+
+class _LazyPackageReader(PackageReader):
+    @lazyproperty
+    def _blob_reader(self):
+        import zipfile
+
+        return _ZipMembers(zipfile.ZipFile(self._pkg_file))
+
+
+class _LazyPackageLoader(_PackageLoader):
+    """XML part 照常解析，其餘 part 以 _ZipEntryRef 建立、延後讀取。"""
+
+    @lazyproperty
+    def _package_reader(self):
+        return _LazyPackageReader(self._pkg_file)
+
+    @lazyproperty
+    def _parts(self):
+        content_types = self._content_types
+        reader = self._package_reader
+        zf = reader._blob_reader.zip
+        parts = {}
+        for partname in self._xml_rels:
+            if partname == "/" or partname not in reader:
+                continue
+            content_type = content_types[partname]
+            cls = PartFactory._part_cls_for(content_type)
+            if issubclass(cls, XmlPart):
+                parts[partname] = cls.load(partname, content_type, self._package, reader[partname])
+            else:
+                ref = _ZipEntryRef(zf, partname.membername)
+                parts[partname] = _lazy_part_class(cls).load(partname, content_type, self._package, ref)
+        return parts
+
+
+class _LazyPackage(Package):
+    """延遲載入的 package；擁有來源 zip，用完以 close() 關閉（之後尚未讀取的 blob 就不能再讀）。"""
+
+    _zip = None
+
+    def _load(self):
+        loader = _LazyPackageLoader(self._pkg_file, self)
+        try:
+            pkg_xml_rels, parts = loader._load()
+        finally:
+            if "_package_reader" in loader.__dict__:
+                self._zip = loader._package_reader._blob_reader.zip
+        try:
+            self._rels.load_from_xml(PACKAGE_URI, pkg_xml_rels, parts)
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def close(self):
+        zf, self._zip = self._zip, None
+        if zf is not None:
+            zf.close()
+
+
+# 目標 package → 合併進來的來源 _LazyPackage。移入目標的 part 仍可能從來源 zip 讀取 blob，
+# 來源 zip 要等目標存檔後才能以 close_sources 關閉
+_source_packages = weakref.WeakKeyDictionary()
+
+
+def _adopt_source(dest_prs, src_prs):
+    """把 src_prs 的來源 zip 交給 dest_prs 管理，由 close_sources(dest_prs) 關閉。"""
+    src_package = src_prs.part.package
+    if isinstance(src_package, _LazyPackage):
+        _source_packages.setdefault(dest_prs.part.package, []).append(src_package)
+
+
+def _close_source(src_prs):
+    src_package = src_prs.part.package
+    if isinstance(src_package, _LazyPackage):
+        src_package.close()
+
+
+def close_sources(prs):
+    """關閉合併進 prs 的來源簡報 zip；在 save_presentation 之後（或放棄這份簡報時）呼叫。"""
+    for src_package in _source_packages.pop(prs.part.package, ()):
+        src_package.close()
+
+
+def open_source_presentation(path):
+    """
+    開啟只會被挑選複製的來源簡報；圖片影音等 blob 到真正用到時才從 zip 讀取。
+    zip 保持開啟，用完以 prs.part.package.close() 關閉，合併進其他簡報時見 close_sources。
+    """
+    prs = _LazyPackage.open(str(path)).main_document_part.presentation
+    _track_part_sources(prs, path)
+    return prs
+
+
+def _copy_zip_entry(zin, info, zout, name):
+    """把 zin 的 entry 以原本的壓縮資料寫進 zout（不解壓、不重壓）。"""
+    import struct
+    import zipfile
+
+    fp = zin.fp
+    fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, fp.read(zipfile.sizeFileHeader))
+    fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+
+    out = zipfile.ZipInfo(name, info.date_time)
+    out.compress_type = info.compress_type
+    out.CRC = info.CRC
+    out.compress_size = info.compress_size
+    out.file_size = info.file_size
+    out.external_attr = info.external_attr
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = fp.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise zipfile.BadZipFile(f"{zin.filename} 的 {info.filename} 資料不完整")
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+
+    # 與 ZipFile 自己寫完一個 entry 後的狀態一致，close() 時才會寫進 central directory
+    zout.start_dir = zout.fp.tell()
+    zout.filelist.append(out)
+    zout.NameToInfo[name] = out
+
+
+class _PassthroughPackageWriter(PackageWriter):
+    """PackageWriter 的變形：來源可追溯且未變動的二進位 part 直接搬壓縮資料。"""
+
+    def _write_parts(self, phys_writer):
+        import zipfile
+
+        zout = phys_writer._zipf
+        sources = {}  # 來源路徑 → 開啟中的 ZipFile（檔案已變動則為 None）
+        try:
+            for part in self._parts:
+                src = _part_sources.get(part)
+                if src is None or not self._copy_raw(zout, part, src, sources):
+                    phys_writer.write(part.partname, part.blob)
+                    _count("parts_serialized")
+                else:
+                    _count("parts_passthrough")
+                if part._rels:
+                    phys_writer.write(part.partname.rels_uri, part.rels.xml)
+        finally:
+            for zin in sources.values():
+                if zin is not None:
+                    zin.close()
+
+    @staticmethod
+    def _copy_raw(zout, part, src, sources):
+        import zipfile
+
+        path, stamp, member, blob = src
+        if part.__dict__.get("_blob") is not blob:
+            return False
+        if path not in sources:
+            try:
+                sources[path] = zipfile.ZipFile(path) if _file_stamp(path) == stamp else None
+            except (OSError, zipfile.BadZipFile):
+                sources[path] = None
+        zin = sources[path]
+        if zin is None:
+            return False
+        try:
+            info = zin.getinfo(member)
+        except KeyError:
+            return False
+        if info.file_size != len(blob):
+            return False
+        _copy_zip_entry(zin, info, zout, part.partname.membername)
+        return True
+
+
+def save_presentation(prs, output_path):
+    """
+    存檔；可追溯來源的二進位 part 直接從來源 zip 搬壓縮資料。
+    先寫到暫存檔再取代，輸出檔本身也是來源時（例如增量更新）才不會讀寫同一個檔。
+    """
+    import os
+
+    output_path = Path(output_path)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    package = prs.part.package
+    try:
+        _PassthroughPackageWriter.write(str(tmp), package._rels, tuple(package.iter_parts()))
+        os.replace(tmp, output_path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
 
 # ── 投影片複製插入 ────────────────────────────────────────────────────────────
@@ -271,38 +1046,202 @@ def _set_rel(part, rId, reltype, target, is_external=False):
     part._rels._rels[rId] = _Relationship(base_uri, rId, reltype, mode, target)
 
 
-def _collect_used_partnames(prs):
-    names = set()
-    for slide in prs.slides:
-        for rel in slide.part.rels.values():
-            if not rel.is_external:
-                names.add(str(rel.target_part.partname))
-    return names
+_NUMBERED_PARTNAME_RE = re.compile(r"^(?P<dir>.*/)(?P<prefix>[^/]*?)(?P<n>\d+)(?P<ext>\.[^./]*)$")
 
 
-def _unique_partname(existing: set, suffix: str) -> str:
-    n = 1
-    while True:
-        candidate = f"/ppt/media/image{n}{suffix}"
-        if candidate not in existing:
-            return candidate
-        n += 1
+def _media_prefix(content_type, src_partname):
+    """依 content type 決定檔名前綴，與 PowerPoint 一致：圖片 imageN，影音 mediaN。"""
+    major = content_type.split("/", 1)[0]
+    if major == "image":
+        return "image"
+    if major in ("video", "audio"):
+        return "media"
+    m = _NUMBERED_PARTNAME_RE.match(src_partname)
+    return m.group("prefix") if m else PurePosixPath(src_partname).stem
 
 
-def _insert_slide(dest_prs, src_slide, after_index, used_partnames: set):
+class PartnameAllocator:
+    """
+    以「目錄 + 前綴 + 副檔名」各自記錄已用到的最大編號，常數時間配發不衝突的 partname。
+    建立時以 package 實際的所有 part 為準。
     """
-    複製 src_slide 並插入 dest_prs 的 after_index 之後。
 
-    要點：
-    - 用 add_slide 取得合法 sldId；之後換掉 XML 及 rels
-    - media part 若 partname 衝突就重新命名（但 rId 保持不變，
-      讓 slide XML 裡的 r:id 參照不用修改）
-    - 同一個 blob（例如 video 有兩個 rel）只建一個 Part，第二個 rel 重用
+    def __init__(self, partnames):
+        self.used = set()
+        self._next = {}
+        for pn in partnames:
+            self._mark(pn)
+
+    def _mark(self, pn):
+        self.used.add(pn)
+        m = _NUMBERED_PARTNAME_RE.match(pn)
+        if m:
+            key = (m.group("dir"), m.group("prefix"), m.group("ext"))
+            n = int(m.group("n")) + 1
+            if n > self._next.get(key, 1):
+                self._next[key] = n
+
+    def claim(self, partname, content_type):
+        """partname 沒被用過就直接使用，否則依 content type 配一個新名字。"""
+        if partname not in self.used:
+            self._mark(partname)
+            return partname
+        path = PurePosixPath(partname)
+        key = (f"{path.parent}/", _media_prefix(content_type, partname), path.suffix)
+        n = self._next.get(key, 1)
+        candidate = f"{key[0]}{key[1]}{n}{key[2]}"
+        while candidate in self.used:  # 只有名字不符合編號格式時才可能發生
+            n += 1
+            candidate = f"{key[0]}{key[1]}{n}{key[2]}"
+        self._mark(candidate)
+        return candidate
+
+
+# 指向來源簡報其他投影片、母片、版面等簡報層級 part 的關係：不跟著複製，
+# 只能對應到目標簡報既有的 part（見 MediaStore.copy_rels 的 shared），對應不到就略過
+_DECK_RELTYPES = frozenset((RT.SLIDE, RT.SLIDE_LAYOUT, RT.SLIDE_MASTER, RT.NOTES_MASTER,
+                            RT.HANDOUT_MASTER, RT.THEME))
+
+
+_MEDIA_CONTENT_TYPES = ("image/", "video/", "audio/")
+
+
+def _is_media_part(part):
+    """圖片與影音：內容相同就可以共用同一個 part。"""
+    if isinstance(part, XmlPart):
+        return False
+    return isinstance(part, (ImagePart, MediaPart)) or part.content_type.startswith(_MEDIA_CONTENT_TYPES)
+
+
+class MediaStore:
     """
-    prs_elm  = dest_prs.part._element
-    sldIdLst = prs_elm.find(qn("p:sldIdLst"))
+    整份目標簡報共用的 part 倉庫。
+
+    - 圖片與影音 part 以 blob 內容的 hash 去重：建立時先把目標簡報既有的登記進來，
+      之後從報告／提案簡報複製過來的相同內容都會指向同一個 part，只寫一次
+    - 其他二進位 part（圖表的內嵌活頁簿、OLE 物件等）屬於各自的擁有者，即使內容相同也不合併，
+      只依來源 part 記在 _copied；否則在 PowerPoint 編輯其中一張圖表的資料會改到另一張
+    - copy_rels 沿著關係圖遞迴複製 XML part（圖表、備忘稿等）與其下的 part；
+      每個來源 part 在整個合併過程只複製一次，多張投影片共用的子圖也只有一份
+    """
+
+    def __init__(self, prs):
+        self.package = prs.part.package
+        parts = list(self.package.iter_parts())
+        self.partnames = PartnameAllocator(str(part.partname) for part in parts)
+        self._by_digest = {}
+        self._copied = {}  # 來源 part → 目標 part
+        for part in parts:
+            if not _is_media_part(part) or not str(part.partname).startswith("/ppt/"):
+                continue
+            if part.blob:
+                self._by_digest.setdefault(self._key(part.blob, part.content_type), part)
+
+    @staticmethod
+    def _key(blob, content_type):
+        import hashlib
+        if isinstance(blob, _ZipEntryRef):
+            return blob.sha1(), content_type
+        return hashlib.sha1(blob).digest(), content_type
+
+    def get_or_add(self, tp, move=False):
+        """
+        回傳與圖片／影音 part tp 內容相同的目標 part；沒有就建一個新的。
+        move=True 表示來源簡報用完即丟：直接把 tp 改名移進目標 package，不另建 Part。
+        延遲載入的 tp 以串流計算 hash，只有真的要建新 Part 時才讀進記憶體。
+        """
+        blob = _peek_blob(tp)
+        key = self._key(blob, tp.content_type)
+        part = self._by_digest.get(key)
+        if part is not None:
+            _count("media_reused")
+            if move:
+                _unload_blob(tp)
+            return part
+
+        _count("media_added")
+        _count("media_bytes_added", len(blob))
+        part = self._by_digest[key] = self._add_blob_part(tp, move)
+        return part
+
+    def _add_blob_part(self, tp, move):
+        """以新的 partname 把二進位 part tp 放進目標 package，不做去重。"""
+        new_pn = PackURI(self.partnames.claim(str(tp.partname), tp.content_type))
+        if move:
+            # 來源紀錄以 part 物件為 key，改名後仍可原封搬移；
+            # 延遲載入的 blob 換回 zip 參照，存檔時才直接從來源 zip 搬
+            tp.partname = new_pn
+            tp._package = self.package
+            _unload_blob(tp)
+            return tp
+        cls = type(tp)
+        if issubclass(cls, _LazyBlobMixin):
+            cls = cls.__bases__[1]
+        part = cls(new_pn, tp.content_type, self.package, tp._blob)
+        src = _part_sources.get(tp)
+        if src is not None:
+            _part_sources[part] = src
+        return part
+
+    def copy_rels(self, src_part, dest_part, shared, move=False):
+        """
+        依 src_part 的 rels 重建 dest_part 的 rels（rId 不變，XML 裡的 r:id 不必修改）。
+
+        shared 為 {來源 part: 目標 part}，例如投影片本身與其版面；
+        其餘 internal 目標依關係圖複製（_DECK_RELTYPES 除外），結果記在 _copied 供之後重用。
+        src_part 與 dest_part 可以是同一個 part（move 時就地改寫）。
+        """
+        rels = list(src_part.rels.items())
+        dest_part._rels._rels.clear()
+        for rId, rel in rels:
+            if rel.is_external:
+                _set_rel(dest_part, rId, rel.reltype, rel._target, is_external=True)
+                continue
+            target = self._copy_part(rel.target_part, rel.reltype, shared, move)
+            if target is not None:
+                _set_rel(dest_part, rId, rel.reltype, target)
+
+    def _copy_part(self, tp, reltype, shared, move):
+        target = shared.get(tp)
+        if target is not None:
+            return target
+        if reltype == RT.NOTES_MASTER:
+            return self.package.presentation_part.notes_master_part
+        if reltype in _DECK_RELTYPES:
+            return None
+        target = self._copied.get(tp)
+        if target is not None:
+            _count("parts_reused")
+            return target
+
+        if not isinstance(tp, XmlPart):
+            if not _peek_blob(tp):
+                return None
+            if _is_media_part(tp):
+                target = self.get_or_add(tp, move=move)
+            else:
+                _count("parts_copied")
+                target = self._add_blob_part(tp, move)
+            self._copied[tp] = target
+            return target
+
+        new_pn = PackURI(self.partnames.claim(str(tp.partname), tp.content_type))
+        _count("parts_copied")
+        if move:
+            tp.partname = new_pn
+            tp._package = self.package
+            target = tp
+        else:
+            target = type(tp)(new_pn, tp.content_type, self.package, deepcopy(tp._element))
+        # 先登記再處理 rels，關係圖有循環時才不會無限遞迴
+        self._copied[tp] = target
+        self.copy_rels(tp, target, shared, move)
+        return target
 
-    # 1. 選 layout (優先使用名稱匹配)
+
+def _pick_dest_layout(dest_prs, src_slide):
+    """為 src_slide 在 dest_prs 中挑一個版面配置。"""
+    # 優先使用名稱匹配
     src_layout_name = src_slide.slide_layout.name
     dest_layout = next(
         (l for l in dest_prs.slide_layouts if l.name == src_layout_name),
@@ -320,13 +1259,34 @@ def _insert_slide(dest_prs, src_slide, after_index, used_partnames: set):
     # 若都沒對到，回退至常用內容版面 (通常 index 1 是內容頁，比 index 0 的標題頁合適)
     if dest_layout is None:
         dest_layout = dest_prs.slide_layouts[1] if len(dest_prs.slide_layouts) > 1 else dest_prs.slide_layouts[0]
+    return dest_layout
+
+
+def _insert_slide(dest_prs, src_slide, media: MediaStore, move=False):
+    """
+    複製 src_slide 成為 dest_prs 的新投影片並回傳（位置由 SlideOrderPlan 決定）。
+
+    要點：
+    - 用 add_slide 取得合法 sldId；之後換掉 XML 及 rels
+    - 其他 part 交給 MediaStore：內容相同的 blob（同一張投影片的 video 兩個 rel、
+      或報告每頁重複的 logo）整份簡報只建一個 Part；圖表、內嵌活頁簿、備忘稿沿關係圖複製，
+      同一個來源 part 只複製一次；partname 衝突就重新命名
+      （rId 保持不變，讓 slide XML 裡的 r:id 參照不用修改）
+    - move=True（來源簡報用完即丟）：不 deepcopy，直接接手來源的 XML 樹與 media part；
+      之後來源投影片不可再使用，應以 _release_source_slide 移除
+    """
+    _count("slides_copied")
+    if move:
+        _count("slides_moved")
+    # 1. 選 layout
+    dest_layout = _pick_dest_layout(dest_prs, src_slide)
 
     # 2. add_slide → 取得有合法 sldId 的新 slide
     new_slide = dest_prs.slides.add_slide(dest_layout)
     new_part  = new_slide.part
 
-    # 3. 換掉 XML（深度複製 src）
-    new_part._element = deepcopy(src_slide.part._element)
+    # 3. 換掉 XML（深度複製 src；move 時直接接手）
+    new_part._element = src_slide.part._element if move else deepcopy(src_slide.part._element)
 
     # 【核心修正】移除從來源帶過來的背景設定，強制讓它繼承目標版面 (dest_layout) 的底圖
     # 背景可能在 p:sld/p:bg 或 p:sld/p:cSld/p:bg
@@ -346,169 +1306,492 @@ def _insert_slide(dest_prs, src_slide, after_index, used_partnames: set):
     if 'showMasterSp' in new_part._element.attrib:
         del new_part._element.attrib['showMasterSp']
 
-    # 4. 清掉所有舊 rels，重新建立
-    new_part._rels._rels.clear()
+    # 4. 依來源 rels 重建：版面對應到 dest_layout；備忘稿指回投影片時對應到新投影片；
+    #    圖片影音、圖表（含內嵌活頁簿）、備忘稿等沿關係圖複製，整個合併中共用的 part 只複製一次
+    shared = {src_slide.part: new_part, src_slide.slide_layout.part: dest_layout.part}
+    media.copy_rels(src_slide.part, new_part, shared, move=move)
 
-    # 記錄「src partname → 已建立的 new Part」，避免同一個 part 建兩次
-    built_parts: dict[str, object] = {}
+    return new_slide
 
-    for rId, rel in src_slide.part.rels.items():
-        if rel.is_external:
-            _set_rel(new_part, rId, rel.reltype, rel._target, is_external=True)
-            continue
 
-        tp = rel.target_part
+def _source_sld_ids(src_prs):
+    """來源簡報的 slide part → sldId 元素；逐張移除前建一次，供 _release_source_slide 查詢。"""
+    prs_part = src_prs.part
+    return {prs_part.related_part(sld_id.rId): sld_id for sld_id in src_prs.slides._sldIdLst.sldId_lst}
 
-        # ── slideLayout ──────────────────────────────────────────────────
-        if "slideLayout" in rel.reltype:
-            _set_rel(new_part, rId, rel.reltype, dest_layout.part)
-            continue
 
-        # ── media / image / video ────────────────────────────────────────
-        blob = tp._blob
-        if not blob:
-            continue
-
-        old_pn = str(tp.partname)
+def _release_source_slide(src_prs, src_slide, sld_ids):
+    """
+    把已處理完的投影片從來源簡報移除，slide part 與其 XML 不再被來源簡報持有，可以立即回收。
+    sld_ids 為 _source_sld_ids 的結果，每次移除不必掃描整個 sldIdLst。
+    """
+    sld_id = sld_ids.pop(src_slide.part, None)
+    if sld_id is None:
+        return
+    src_prs.slides._sldIdLst.remove(sld_id)
+    # sldId 移除後 XML 已不再參照這個 rId；drop_rel 會掃描整份 presentation.xml 計數，這裡直接移除
+    src_prs.part.rels.pop(sld_id.rId)
+    slide_text_index(src_prs).invalidate(int(sld_id.get("id")))
+
+
+_SHAPE_TAGS = {qn(t) for t in ("p:sp", "p:grpSp", "p:graphicFrame", "p:cxnSp", "p:pic", "p:contentPart")}
+_R_ATTR_PREFIX = f"{{{R_NS}}}"
+
+
+def _strip_rel_refs(elem):
+    """移除圖片填滿、超連結等所有帶 r:* 參照的元素，讓複本不需要任何 rels。"""
+    for fill in list(elem.iter(qn("a:blipFill"))):
+        fill.getparent().remove(fill)
+    for el in list(elem.iter()):
+        if el.getparent() is not None and any(k.startswith(_R_ATTR_PREFIX) for k in el.attrib):
+            el.getparent().remove(el)
+
+
+def _text_only_copy(shape_elem):
+    """回傳只保留文字框與表格的 shape 複本（群組會遞迴篩選），沒有文字時回傳 None。"""
+    if shape_elem.tag == qn("p:sp"):
+        txBody = shape_elem.find(qn("p:txBody"))
+        if txBody is None or not "".join(txBody.itertext()).strip():
+            return None
+        copy = deepcopy(shape_elem)
+        _strip_rel_refs(copy)
+        return copy
+    if shape_elem.tag == qn("p:graphicFrame"):
+        # 表格（a:tbl）保留；圖表、SmartArt、OLE 等都依賴 rels，不保留
+        tbl = shape_elem.find(f"{qn('a:graphic')}/{qn('a:graphicData')}/{qn('a:tbl')}")
+        if tbl is None or not "".join(tbl.itertext(T_TAG)).strip():
+            return None
+        copy = deepcopy(shape_elem)
+        _strip_rel_refs(copy)
+        return copy
+    if shape_elem.tag == qn("p:grpSp"):
+        children = [c for c in (_text_only_copy(ch) for ch in shape_elem if ch.tag in _SHAPE_TAGS) if c is not None]
+        if not children:
+            return None
+        group = etree.Element(shape_elem.tag, nsmap=shape_elem.nsmap)
+        for ch in shape_elem:
+            if ch.tag not in _SHAPE_TAGS:
+                group.append(deepcopy(ch))
+        group.extend(children)
+        _strip_rel_refs(group)
+        return group
+    return None
+
+
+def _insert_text_only_slide(dest_prs, src_slide):
+    """
+    只把 src_slide 的文字框搬到 dest_prs 的新投影片（套用目標版面），
+    不複製圖片、影音與任何 media part；回傳新投影片。
+    """
+    dest_layout = _pick_dest_layout(dest_prs, src_slide)
+    new_slide = dest_prs.slides.add_slide(dest_layout)
+    spTree = new_slide.shapes._spTree
+
+    # add_slide 依版面帶出的空白 placeholder 先移除，改放來源的文字框
+    for el in [ch for ch in spTree if ch.tag in _SHAPE_TAGS]:
+        spTree.remove(el)
+
+    src_tree = src_slide.part._element.find(qn("p:cSld")).find(qn("p:spTree"))
+    copied = 0
+    for ch in src_tree:
+        if ch.tag in _SHAPE_TAGS:
+            copy = _text_only_copy(ch)
+            if copy is not None:
+                spTree.append(copy)
+                copied += 1
+    if not copied:
+        title = (_slide_text(src_slide).splitlines() or [""])[0][:15] or f"id {src_slide.slide_id}"
+        print(f"⚠️  投影片「{title}」沒有可保留的文字框或表格"
+              f"（文字可能在圖表、SmartArt 或圖片中），只保留文字後成為空白投影片。", file=sys.stderr)
+    _count("slides_text_only")
+    return new_slide
+
+
+class SlideOrderPlan:
+    """
+    收集「把新投影片插在某張之後」的要求，最後在 apply() 一次改寫 p:sldIdLst，
+    不必每插一張就重排整個清單。
 
-        # 同一個 src part 已建過（例如 video 兩個 rel 指向同一個 mp4）
-        if old_pn in built_parts:
-            _set_rel(new_part, rId, rel.reltype, built_parts[old_pn])
-            continue
+    add_group(anchor_id) 開一組插入：錨點為某張投影片時，這組緊接在錨點之後
+    （排在先前插在同一錨點的組之前，與逐張插入的結果一致）；None 代表放到最後。
+    """
 
-        suffix = PurePosixPath(old_pn).suffix
-        new_pn = old_pn if old_pn not in used_partnames else _unique_partname(used_partnames, suffix)
-        used_partnames.add(new_pn)
+    def __init__(self, prs):
+        self.prs = prs
+        self._groups = {}
 
-        if isinstance(tp, ImagePart):
-            new_media = ImagePart(PackURI(new_pn), tp.content_type, dest_prs.part.package, blob)
+    def add_group(self, anchor_id):
+        group = []
+        groups = self._groups.setdefault(anchor_id, [])
+        if anchor_id is None:
+            groups.append(group)
         else:
-            new_media = Part(PackURI(new_pn), tp.content_type, dest_prs.part.package, blob)
+            groups.insert(0, group)
+        return group
+
+    def _children(self, anchor_id):
+        return [sid for group in self._groups.get(anchor_id, []) for sid in group]
+
+    def ordered_ids(self):
+        sldIdLst = self.prs.part._element.find(qn("p:sldIdLst"))
+        base = [int(el.get("id")) for el in sldIdLst.findall(qn("p:sldId"))]
+        planned = {sid for groups in self._groups.values() for group in groups for sid in group}
+
+        # 原有投影片依序展開，各自後面接上插在它之後的組（可巢狀）；最後接「放到最後」的組
+        order = []
+        stack = [iter([sid for sid in base if sid not in planned] + self._children(None))]
+        while stack:
+            sid = next(stack[-1], None)
+            if sid is None:
+                stack.pop()
+                continue
+            order.append(sid)
+            children = self._children(sid)
+            if children:
+                stack.append(iter(children))
+
+        # 新增了卻沒排進計畫的投影片保留在最後
+        seen = set(order)
+        order.extend(sid for sid in base if sid not in seen)
+        return order
+
+    def ordered_slides(self):
+        by_id = {slide.slide_id: slide for slide in self.prs.slides}
+        return [by_id[sid] for sid in self.ordered_ids()]
+
+    def apply(self):
+        sldIdLst = self.prs.part._element.find(qn("p:sldIdLst"))
+        by_id = {int(el.get("id")): el for el in sldIdLst.findall(qn("p:sldId"))}
+        order = self.ordered_ids()
+        for el in by_id.values():
+            sldIdLst.remove(el)
+        sldIdLst.extend(by_id[sid] for sid in order)
+        self._groups.clear()
 
-        built_parts[old_pn] = new_media
-        _set_rel(new_part, rId, rel.reltype, new_media)
 
-    # 5. 把 sldId 移到 after_index 之後
-    _reposition_slide(dest_prs, new_slide, after_index)
+def _slide_text(slide):
+    return "\n".join(
+        shape.text_frame.text for shape in slide.shapes if shape.has_text_frame
+    )
 
 
-def _reposition_slide(prs, slide, after_index):
-    """將投影片移動到 after_index 之後"""
-    sldIdLst = prs.part._element.find(qn("p:sldIdLst"))
-    all_sldIds = list(sldIdLst.findall(qn("p:sldId")))
-    last_el = all_sldIds[-1]  # add_slide 產生的那張永遠在最後
-    sldIdLst.remove(last_el)
+_WS_RE = re.compile(r"\s+")
 
-    all_sldIds = list(sldIdLst.findall(qn("p:sldId")))
-    if after_index + 1 < len(all_sldIds):
-        all_sldIds[after_index + 1].addprevious(last_el)
-    else:
-        sldIdLst.append(last_el)
+# 與 _slide_text 範圍相同：投影片最上層有文字框的 shape
+_SLIDE_TEXT_XPATH = etree.XPath(
+    "./p:cSld/p:spTree/p:sp/p:txBody//a:t/text()", namespaces={"a": A_NS, "p": P_NS}
+)
 
 
-def _slide_text(slide):
-    return "\n".join(
-        shape.text_frame.text for shape in slide.shapes if shape.has_text_frame
-    )
+def _normalize_text(text):
+    """去掉所有空白（含全形空格、換行），讓「提 案 討 論」也能比對到「提案討論」。"""
+    return _WS_RE.sub("", text)
+
+
+class SlideTextIndex:
+    """
+    slide id → 正規化後投影片文字的索引，用來找插入點。
+
+    文字在第一次查詢時才直接從 XML 擷取（不經 python-pptx 的 shape proxy）；
+    投影片 XML 被整個換掉時自動重算，內容就地修改後可呼叫 invalidate()。
+    只以 weakref 指向簡報：索引存在 _slide_text_indexes（以 prs.part 為 key），
+    若強參照 prs 就會讓 key 永遠無法釋放。
+    """
 
+    def __init__(self, prs):
+        self._prs = weakref.ref(prs)
+        self._texts = {}
+
+    @property
+    def prs(self):
+        return self._prs()
+
+    def text(self, slide):
+        elem = slide.part._element
+        entry = self._texts.get(slide.slide_id)
+        if entry is None or entry[0] is not elem:
+            entry = (elem, _normalize_text("".join(_SLIDE_TEXT_XPATH(elem))))
+            self._texts[slide.slide_id] = entry
+        return entry[1]
+
+    def invalidate(self, slide_id=None):
+        if slide_id is None:
+            self._texts.clear()
+        else:
+            self._texts.pop(slide_id, None)
 
-def insert_report_slides(dest_prs, report_path: Path, keyword="工作報告"):
-    report_prs = Presentation(str(report_path))
+    def find(self, keywords, slides=None, start=0):
+        """回傳 slides（預設為簡報目前順序）中第一張含任一關鍵字的位置，找不到回傳 None。"""
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        needles = [_normalize_text(k) for k in keywords]
+        if slides is None:
+            slides = list(self.prs.slides)
+        for i in range(start, len(slides)):
+            text = self.text(slides[i])
+            if any(k in text for k in needles):
+                return i
+        return None
+
+
+# PresentationPart → SlideTextIndex；簡報被釋放時索引跟著消失
+_slide_text_indexes = weakref.WeakKeyDictionary()
+
+
+def slide_text_index(prs):
+    index = _slide_text_indexes.get(prs.part)
+    if index is None:
+        index = _slide_text_indexes[prs.part] = SlideTextIndex(prs)
+    return index
+
+
+def _find_slide(prs, slides, keywords, template=None):
+    """
+    回傳 slides 中第一張含任一關鍵字的位置（找不到為 None）。
+    有公版分析結果時，公版原有的投影片直接以記錄的錨點判斷，只有新插入的投影片才擷取文字。
+    """
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    index = slide_text_index(prs)
+    anchors = template.get("anchors", {}) if template else {}
+    if not template or any(k not in anchors for k in keywords):
+        return index.find(keywords, slides)
+
+    known = set(template["slide_ids"])
+    hits = {anchors[k] for k in keywords if anchors[k] is not None}
+    for i, slide in enumerate(slides):
+        sid = slide.slide_id
+        if sid in known:
+            if sid in hits:
+                return i
+        elif index.find(keywords, [slide]) is not None:
+            return i
+    return None
+
+
+def insert_report_slides(dest_prs, report_path: Path, keyword="工作報告", media=None, plan=None, template=None,
+                         src_prs=None, move=None):
+    """
+    src_prs 為已開啟的 report_path（見 InputLoader）；None 時自行開啟。
+    move 為 True 時投影片與 media 直接移入 dest_prs（src_prs 之後不可再使用），
+    None 時只有自行開啟的來源才移動。
+    """
+    if move is None:
+        move = src_prs is None
+    report_prs = src_prs if src_prs is not None else open_source_presentation(report_path)
+    if move or src_prs is None:
+        _adopt_source(dest_prs, report_prs)
     total_src  = len(report_prs.slides)
     if total_src < 2:
         print(f"⚠️  {report_path.name} 只有 {total_src} 張，沒有第 2 張可複製。", file=sys.stderr)
         return
 
-    insert_idx = next(
-        (i for i, s in enumerate(dest_prs.slides) if keyword in _slide_text(s)), None
-    )
+    own_plan = plan is None
+    if own_plan:
+        plan = SlideOrderPlan(dest_prs)
+
+    ordered = plan.ordered_slides()
+    insert_idx = _find_slide(dest_prs, ordered, keyword, template)
     if insert_idx is None:
         print(f"⚠️  找不到含「{keyword}」的投影片，附加到最後。", file=sys.stderr)
-        insert_idx = len(dest_prs.slides) - 1
+        insert_idx = len(ordered) - 1
+        group = plan.add_group(None)
+    else:
+        group = plan.add_group(ordered[insert_idx].slide_id)
 
     slides_to_insert = list(report_prs.slides)[1:]
     n = len(slides_to_insert)
     print(f"📋 從「{report_path.name}」複製第 2～{total_src} 張（共 {n} 張），"
           f"插入到第 {insert_idx + 1} 張（「{keyword}」）之後…")
 
-    used_partnames = _collect_used_partnames(dest_prs)
+    if media is None:
+        media = MediaStore(dest_prs)
+
+    # 逐張取出；move 時插入後即從來源移除，來源與目標不會同時各持有一份
+    sld_ids = _source_sld_ids(report_prs) if move else None
+    slides_to_insert.reverse()
+    while slides_to_insert:
+        src_slide = slides_to_insert.pop()
+        group.append(_insert_slide(dest_prs, src_slide, media=media, move=move).slide_id)
+        if move:
+            _release_source_slide(report_prs, src_slide, sld_ids)
+        del src_slide
+
+    if own_plan:
+        plan.apply()
+    print(f"   ✅ 插入完成（共 {n} 張）")
 
-    for offset, src_slide in enumerate(slides_to_insert):
-        _insert_slide(dest_prs, src_slide, after_index=insert_idx + offset,
-                      used_partnames=used_partnames)
 
-    print(f"   ✅ 插入完成（共 {n} 張）")
+SLIDE_ACTION_COPY      = "copy"
+SLIDE_ACTION_TEXT_ONLY = "text_only"
+SLIDE_ACTION_EXCLUDE   = "exclude"
+SLIDE_ACTIONS = (SLIDE_ACTION_COPY, SLIDE_ACTION_TEXT_ONLY, SLIDE_ACTION_EXCLUDE)
 
+DEFAULT_SLIDE_RULES = [
+    {"pattern": "*月份聯合月例會", "action": SLIDE_ACTION_EXCLUDE},
+    {"pattern": "各類宣導",       "action": SLIDE_ACTION_TEXT_ONLY},
+    {"pattern": "榮譽榜",         "action": SLIDE_ACTION_TEXT_ONLY},
+    {"pattern": "重要活動訊息",   "action": SLIDE_ACTION_TEXT_ONLY},
+    {"pattern": "*月份活動訊息",  "action": SLIDE_ACTION_TEXT_ONLY},
+    {"pattern": "*活動預告",      "action": SLIDE_ACTION_TEXT_ONLY},
+]
 
-def _matches_pattern(text, patterns):
-    import fnmatch
-    # 移除空格與全形空格以增加比對強度
-    t = text.replace(' ', '').replace('　', '').strip()
-    for p in patterns:
-        p_clean = p.replace(' ', '').replace('　', '').strip()
-        if '*' in p_clean:
-            # 使用 fnmatch，前後補 * 確保只要包含即可
-            if fnmatch.fnmatch(t, f'*{p_clean}*'):
-                return True
-        elif p_clean in t:
-            return True
-    return False
 
+class SlideRules:
+    """
+    提案簡報的投影片篩選規則：pattern（可含 * 萬用字元，比對時忽略空白）→ action。
 
-def insert_external_proposal_slides(dest_prs, src_path, start_keyword="提案討論", end_keyword="臨時動議"):
-    src_prs = Presentation(str(src_path))
-    
-    # 定義規則
-    EXCLUDE_KEYWORDS = ["*月份聯合月例會"]
-    TEXT_ONLY_KEYWORDS = ["各類宣導", "榮譽榜", "重要活動訊息", "*月份活動訊息", "*活動預告"]
-    
-    start_idx = -1
-    end_idx = len(src_prs.slides)
-    
-    for i, slide in enumerate(src_prs.slides):
-        text = _slide_text(slide)
-        if start_idx == -1 and start_keyword in text:
-            start_idx = i
-        elif start_idx != -1 and end_keyword in text:
-            end_idx = i
-            break
-            
-    if start_idx == -1:
+    每條規則依 * 拆成幾段字面字串，依序用 str.find 往後找，整體是線性時間；
+    多條規則同時命中時，以清單中較前面的規則為準。沒有命中的投影片為完整複製（copy）。
+    """
+
+    def __init__(self, rules):
+        self.rules = []
+        self._pieces = []
+        for n, rule in enumerate(rules):
+            pattern = _normalize_text(str(rule.get("pattern", "")))
+            action = rule.get("action", SLIDE_ACTION_COPY)
+            if not pattern:
+                raise ValueError(f"投影片規則第 {n + 1} 條沒有 pattern")
+            if action not in SLIDE_ACTIONS:
+                raise ValueError(f"投影片規則第 {n + 1} 條的 action 不正確：{action}"
+                                 f"（可用：{', '.join(SLIDE_ACTIONS)}）")
+            self.rules.append({"pattern": pattern, "action": action})
+            # 頭尾的 * 只代表「前後可有任意文字」，本來就是子字串比對，直接去掉
+            self._pieces.append([piece for piece in pattern.strip("*").split("*") if piece])
+
+    @classmethod
+    def load(cls, path):
+        """讀取 JSON 規則檔：[{"pattern": "...", "action": "exclude|text_only|copy"}, ...]"""
+        import json
+
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(data.get("rules", []) if isinstance(data, dict) else data)
+
+    def match(self, normalized_text):
+        """回傳第一條命中的規則，沒有則回傳 None。文字需先經 _normalize_text。"""
+        for rule, pieces in zip(self.rules, self._pieces):
+            pos = 0
+            for piece in pieces:
+                pos = normalized_text.find(piece, pos)
+                if pos < 0:
+                    break
+                pos += len(piece)
+            else:
+                return rule
+        return None
+
+    def action_for(self, normalized_text):
+        rule = self.match(normalized_text)
+        return rule["action"] if rule else SLIDE_ACTION_COPY
+
+
+def load_slide_rules(rules=None):
+    """rules 可為 None（內建規則）、規則檔路徑、規則 list 或 SlideRules。"""
+    if rules is None:
+        return SlideRules(DEFAULT_SLIDE_RULES)
+    if isinstance(rules, SlideRules):
+        return rules
+    if isinstance(rules, (str, Path)):
+        return SlideRules.load(rules)
+    return SlideRules(rules)
+
+
+def insert_external_proposal_slides(dest_prs, src_path, start_keyword="提案討論", end_keyword="臨時動議",
+                                    media=None, plan=None, rules=None, template=None, src_prs=None, move=None):
+    """
+    src_prs 為已開啟的 src_path（見 InputLoader）；None 時自行開啟。
+    move 同 insert_report_slides：True 時複製的投影片直接移入 dest_prs 並從來源移除。
+    """
+    if move is None:
+        move = src_prs is None
+    own_src = src_prs is None
+    if own_src:
+        src_prs = open_source_presentation(src_path)
+    if move or own_src:
+        _adopt_source(dest_prs, src_prs)
+    rules = load_slide_rules(rules)
+
+    src_slides = list(src_prs.slides)
+    src_index = slide_text_index(src_prs)
+    start_idx = src_index.find(start_keyword, src_slides)
+    if start_idx is None:
         print(f"⚠️  在來源檔案「{src_path.name}」中找不到「{start_keyword}」標題，跳過插入。", file=sys.stderr)
         return
 
-    slides_to_insert = list(src_prs.slides)[start_idx + 1:end_idx]
+    end_idx = src_index.find(end_keyword, src_slides, start=start_idx + 1)
+    if end_idx is None:
+        end_idx = len(src_slides)
+
+    slides_to_insert = src_slides[start_idx + 1:end_idx]
     if not slides_to_insert:
         return
         
     print(f"📋 從「{src_path.name}」擷取「{start_keyword}」至「{end_keyword}」（共 {len(slides_to_insert)} 張）...")
     
+    own_plan = plan is None
+    if own_plan:
+        plan = SlideOrderPlan(dest_prs)
+
     # 尋找目標簡報的插入點
-    dest_idx = next(
-        (i for i, s in enumerate(dest_prs.slides) if start_keyword in _slide_text(s)), None
-    )
-    if dest_idx is None:
+    ordered = plan.ordered_slides()
+    dest_idx = _find_slide(dest_prs, ordered, start_keyword, template)
+    dest_id = ordered[dest_idx].slide_id if dest_idx is not None else None
+    if dest_id is None:
         print(f"⚠️  目標簡報中找不到「{start_keyword}」的分隔投影片，將附加到最後。", file=sys.stderr)
-        dest_idx = len(dest_prs.slides) - 1
-        
-    used_partnames = _collect_used_partnames(dest_prs)
+    group = plan.add_group(dest_id)
+
+    if media is None:
+        media = MediaStore(dest_prs)
     
-    current_dest_offset = 0
-    for src_slide in slides_to_insert:
-        slide_text = _slide_text(src_slide)
-        
-        # 1. 檢查是否排除
-        if _matches_pattern(slide_text, EXCLUDE_KEYWORDS):
-            print(f"   ⏩ 跳過投影片：{slide_text.splitlines()[0][:15]}...")
+    del src_slides
+    count = len(slides_to_insert)
+    sld_ids = _source_sld_ids(src_prs) if move else None
+    slides_to_insert.reverse()
+    while slides_to_insert:
+        src_slide = slides_to_insert.pop()
+        action = rules.action_for(src_index.text(src_slide))
+
+        if action == SLIDE_ACTION_EXCLUDE:
+            slide_text = _slide_text(src_slide)
+            print(f"   ⏩ 跳過投影片：{(slide_text.splitlines() or [''])[0][:15]}...")
             continue
-            
-        target_idx = dest_idx + current_dest_offset
-        
-        # 2. 一般完整複製
-        _insert_slide(dest_prs, src_slide, after_index=target_idx, used_partnames=used_partnames)
-        current_dest_offset += 1
-    
-    print(f"   ✅ 提案簡報插入完成（共 {len(slides_to_insert)} 張）")
+
+        if action == SLIDE_ACTION_TEXT_ONLY:
+            group.append(_insert_text_only_slide(dest_prs, src_slide).slide_id)
+        else:
+            group.append(_insert_slide(dest_prs, src_slide, media=media, move=move).slide_id)
+        if move:
+            _release_source_slide(src_prs, src_slide, sld_ids)
+        del src_slide
+
+    if own_plan:
+        plan.apply()
+    print(f"   ✅ 提案簡報插入完成（共 {count} 張）")
+
+
+def format_proposal_summary(model):
+    """把 parse_meeting_docx 的結果排成給前端複製用的文字。"""
+    output_lines = []
+    for sec in model["sections"]:
+        output_lines.append(f"\n===================={sec['title']}====================")
+        prev = None
+        for item in sec["proposals"]:
+            if sec["kind"] == "effect":
+                if prev is not None and prev["BB_text"]:
+                    output_lines.append("")  # 提案間留空行
+                output_lines.append(item["projectNumber"])
+                for name in ("AA", "BB"):
+                    if item[f"{name}_text"]:
+                        output_lines.append(item[f"{name}_text"])
+            else:
+                output_lines.append(item["projectNumber"])
+                if item["AA_text"]:
+                    output_lines.append(item["AA_text"])
+                    output_lines.append("執行辦法: ")
+                    output_lines.append("")  # 提案間留空行
+            prev = item
+    return "\n".join(output_lines).strip()
 
 
 def extract_proposal_summary_text(doc_path):
@@ -518,133 +1801,815 @@ def extract_proposal_summary_text(doc_path):
     2. 找到 "總會提案討論" 或 "別院提案討論" -> 擷取【提案】、案由，並加上 "執行辦法: "
     3. 遇到 "各類宣導" 停止。
     """
-    import zipfile
-    import xml.etree.ElementTree as ET
-    
-    output_lines = []
     try:
-        with zipfile.ZipFile(str(doc_path), 'r') as z:
-            content = z.read('word/document.xml')
-            root = ET.fromstring(content)
-            namespaces = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-            
-            body = root.find(f".//{{{namespaces['w']}}}body")
-            paragraphs = []
-            if body is not None:
-                for child in body:
-                    if child.tag == f"{{{namespaces['w']}}}p":
-                        text = ''.join(t.text for t in child.findall('.//w:t', namespaces) if t.text)
-                        if text:
-                            paragraphs.append(text.strip())
-
-            # 狀態追蹤
-            in_effect_section = False
-            # 狀態追蹤
-            in_effect_section = False
-            in_discussion_section = False
-            last_marker = None # 記錄上一個處理的欄位 (aa, bb)
-            
-            for text in paragraphs:
-                # 檢查區域切換
-                if '宣讀上次決議案執行成效' in text:
-                    in_effect_section = True
-                    in_discussion_section = False
-                    last_marker = None
-                    output_lines.append(f"\n====================宣讀上次決議案執行成效====================")
-                    continue
-                if '總會提案討論' in text:
-                    in_effect_section = False
-                    in_discussion_section = True
-                    last_marker = None
-                    output_lines.append(f"\n====================總會提案討論====================")
-                    continue
-                if '別院提案討論' in text:
-                    in_effect_section = False
-                    in_discussion_section = True
-                    last_marker = None
-                    output_lines.append(f"\n====================別院提案討論====================")
-                    continue
-                if '各類宣導' in text:
-                    in_effect_section = False
-                    in_discussion_section = False
-                    break
-                
-                stripped = text.replace(' ', '').replace('　', '')
-
-                # 區域內處理
-                if in_effect_section:
-                    if text.startswith('【提案') and '】' in text:
-                        if last_marker == 'bb':
-                            output_lines.append("") # 提案間留空行
-                        output_lines.append(text)
-                        last_marker = 'pro'
-                    elif stripped.startswith('案由：') or stripped.startswith('案由:'):
-                        output_lines.append(text)
-                        last_marker = 'aa'
-                    elif stripped.startswith('執行成效：') or stripped.startswith('執行成效:') or stripped.startswith('執行辦法：') or stripped.startswith('執行辦法:'):
-                        output_lines.append(text)
-                        last_marker = 'bb'
-                    elif last_marker in ['aa', 'bb']:
-                        # 延續上一行內容 (多行處理)
-                        output_lines.append(text)
-                
-                elif in_discussion_section:
-                    if text.startswith('【提案') and '】' in text:
-                        output_lines.append(text)
-                        last_marker = 'pro'
-                    elif stripped.startswith('案由：') or stripped.startswith('案由:'):
-                        output_lines.append(text)
-                        output_lines.append("執行辦法: ")
-                        output_lines.append("") # 提案間留空行
-                        last_marker = 'aa'
-                    elif last_marker == 'aa':
-                        if any(k in stripped for k in ['說明', '討論', '辦法']):
-                            last_marker = 'skip'
-                        else:
-                            # 案由的多行內容 (在遇到說明、討論、辦法之前)
-                            output_lines.insert(-2, text)
-                            
+        return format_proposal_summary(parse_meeting_docx(doc_path))
     except Exception as e:
         return f"⚠️ 文字擷取失敗: {e}"
-        
-    return "\n".join(output_lines).strip()
 
 
-# ── 主流程 ────────────────────────────────────────────────────────────────────
+# ── 公版分析快取 ──────────────────────────────────────────────────────────────
 
-def replace_pptx(input_path, mapping, output_path, report_path=None, doc_path=None, proposal_path=None, debug=False):
-    prs = Presentation(str(input_path))
-    for slide in prs.slides:
-        for shape in slide.shapes:
-            process_shape(shape, mapping, debug)
+TEMPLATE_CACHE_VERSION = 1
+PLACEHOLDER_OPENERS = ["[[", "{{"]
+ANCHOR_KEYWORDS = ["工作報告", "提案討論"] + EFFECT_ANCHOR_KEYWORDS
+
+# 公版內容 hash → 分析結果；瀏覽器（Pyodide）中多次點擊之間直接重用
+_template_analysis_cache: dict[str, dict] = {}
+
+
+def analyze_template(prs):
+    """
+    分析尚未修改的公版，回傳可存成 JSON 的結果：
+
+    - placeholders：slide id → {"slide": [...], "notes": [...]}，含 [[ / {{ 的段落路徑
+    - anchors：各插入點關鍵字 → 第一張含該字的公版投影片 id
+    - proposal_layout：_prepare_proposal_layout 的結果（找不到版面時為 None）
+    """
+    finder = _prefilter_xpath(PLACEHOLDER_OPENERS)
+    slides = list(prs.slides)
+    placeholders = {}
+    for slide in slides:
+        loc = {}
+        root = slide.part._element
+        paths = [_element_path(root, p) for p in finder(root)]
+        if paths:
+            loc["slide"] = paths
         if slide.has_notes_slide:
-            for shape in slide.notes_slide.shapes:
-                process_shape(shape, mapping, debug)
+            root = slide.notes_slide.part._element
+            paths = [_element_path(root, p) for p in finder(root)]
+            if paths:
+                loc["notes"] = paths
+        if loc:
+            placeholders[str(slide.slide_id)] = loc
+
+    # 不用共用的 slide_text_index：公版接下來會被替換，避免留下替換前的文字
+    index = SlideTextIndex(prs)
+    anchors = {}
+    for kw in ANCHOR_KEYWORDS:
+        i = index.find(kw, slides)
+        anchors[kw] = slides[i].slide_id if i is not None else None
+
+    try:
+        proposal_layout = _prepare_proposal_layout(prs.slide_layouts[PROPOSAL_LAYOUT_INDEX])
+    except IndexError:
+        proposal_layout = None
+
+    return {
+        "version": TEMPLATE_CACHE_VERSION,
+        "openers": PLACEHOLDER_OPENERS,
+        "slide_ids": [slide.slide_id for slide in slides],
+        "placeholders": placeholders,
+        "anchors": anchors,
+        "proposal_layout": proposal_layout,
+    }
+
+
+def default_cache_dir():
+    import os
+
+    env = os.environ.get("MEETING_SLIDE_CACHE_DIR")
+    return Path(env) if env else Path.home() / ".cache" / "meeting_slide_tool"
+
+
+def load_template_analysis(input_path, prs=None, cache_dir=None):
+    """
+    取得公版的分析結果：先查記憶體，再查磁碟（cache_dir/template-<sha256>.json），
+    都沒有才分析 prs（未提供時自行開啟 input_path）並寫回快取。
+    cache_dir=False 時不讀寫磁碟。
+    """
+    import json
+
+    digest = _file_digest(input_path)
+    analysis = _template_analysis_cache.get(digest)
+    if analysis is not None:
+        return analysis
+
+    cache_file = None
+    if cache_dir is not False:
+        cache_file = Path(cache_dir or default_cache_dir()) / f"template-{digest}.json"
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+            if data.get("version") == TEMPLATE_CACHE_VERSION:
+                analysis = data
+        except (OSError, ValueError):
+            pass
+
+    if analysis is None:
+        analysis = analyze_template(prs if prs is not None else Presentation(str(input_path)))
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cache_file.with_suffix(".tmp")
+                tmp.write_text(json.dumps(analysis, ensure_ascii=False), encoding="utf-8")
+                tmp.replace(cache_file)
+            except OSError as e:
+                print(f"⚠️  無法寫入公版快取 {cache_file}：{e}", file=sys.stderr)
+
+    _template_analysis_cache[digest] = analysis
+    return analysis
+
+
+def _replace_with_template(prs, matcher, template, debug=False):
+    """依分析結果只處理記錄下來的段落；公版沒有佔位符的投影片完全不碰。"""
+    index = slide_text_index(prs)
+    for slide in prs.slides:
+        loc = template["placeholders"].get(str(slide.slide_id))
+        if not loc:
+            continue
+        changed = False
+        for where, paths in loc.items():
+            root = slide.part._element if where == "slide" else slide.notes_slide.part._element
+            for path in paths:
+                changed |= replace_in_p(_resolve_path(root, path), matcher, debug)
+        if changed:
+            index.invalidate(slide.slide_id)
+
+
+# ── 計時與統計 ────────────────────────────────────────────────────────────────
+# with RunStats() as stats: replace_pptx(...)，之後 stats.to_dict() / to_json() 取得
+# 各階段耗時、記憶體高峰與計數。階段邊界沿用 progress 的 stage 通知；
+# 計數由各函式呼叫 _count()，沒有啟用 RunStats 時不做任何事。
+
+_active_stats = None
+
+
+def _count(key, n=1):
+    if _active_stats is not None:
+        _active_stats.count(key, n)
+
+
+def _max_rss_kb():
+    """目前 process 的最大 RSS（KB）；沒有 resource 模組（Windows、Pyodide）時回傳 None。"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class RunStats:
+    """
+    一次產生過程的統計。
+
+    - stages：每個階段的耗時（秒）、max RSS（KB），trace_memory=True 時另有 Python 配置的記憶體高峰
+    - counts：段落掃描／替換數、複製的投影片、新增的 media 與位元組數、存檔時直接搬移的 part 等
+    - profile=True 時以 cProfile 記錄整段過程，to_dict() 附上累計時間最多的 profile_top 個函式
+    """
+
+    def __init__(self, trace_memory=False, profile=False, profile_top=30):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.profile_top = profile_top
+        self.stages = []
+        self.counts = {}
+        self.total_seconds = None
+        self._current = None
+        self._t0 = None
+        self._profiler = None
+        self._started_tracemalloc = False
+        self._previous = None
+
+    def __enter__(self):
+        import time
+
+        global _active_stats
+        if self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+        if self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._previous, _active_stats = _active_stats, self
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        import time
+
+        global _active_stats
+        self._close_stage()
+        self.total_seconds = time.perf_counter() - self._t0
+        _active_stats = self._previous
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._started_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+        return False
+
+    def enter(self, stage):
+        """結束目前階段並開始 stage；"done" 只結束目前階段。"""
+        import time
+
+        self._close_stage()
+        if stage == "done":
+            return
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        self._current = (stage, time.perf_counter())
+
+    def _close_stage(self):
+        import time
+
+        if self._current is None:
+            return
+        name, t0 = self._current
+        self._current = None
+        entry = {"name": name, "seconds": round(time.perf_counter() - t0, 6), "max_rss_kb": _max_rss_kb()}
+        if self.trace_memory:
+            import tracemalloc
+            entry["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        self.stages.append(entry)
+
+    def count(self, key, n=1):
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def _profile_rows(self):
+        import pstats
+
+        st = pstats.Stats(self._profiler)
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in st.stats.items():
+            rows.append({"function": f"{Path(filename).name}:{line}({func})", "calls": nc,
+                         "tottime": round(tt, 6), "cumtime": round(ct, 6)})
+        rows.sort(key=lambda r: r["cumtime"], reverse=True)
+        return rows[:self.profile_top]
+
+    def to_dict(self):
+        data = {
+            "total_seconds": round(self.total_seconds, 6) if self.total_seconds is not None else None,
+            "stages": self.stages,
+            "counts": dict(sorted(self.counts.items())),
+            "max_rss_kb": _max_rss_kb(),
+        }
+        if self._profiler is not None:
+            data["profile"] = self._profile_rows()
+        return data
+
+    def to_json(self):
+        import json
+
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=1)
+
+
+# ── 輸入預載 ──────────────────────────────────────────────────────────────────
+# 公版、報告簡報、提案簡報、Word 在合併之前互不相關；解壓縮與 lxml 解析大部分時間會釋放 GIL，
+# 因此各自丟進 thread pool 同時載入。合併仍依固定順序進行（輸出與依序處理完全相同），
+# 但每一步只等自己的來源，其他來源繼續在背景載入。
+
+INPUT_LOAD_WORKERS = 4
+
+
+def _threads_available():
+    """Pyodide（emscripten）無法啟動 thread。"""
+    return sys.platform != "emscripten"
+
+
+class _Deferred:
+    """不使用 thread 時代替 Future：第一次 result() 才執行。"""
+
+    def __init__(self, fn, *args):
+        self._fn, self._args = fn, args
+
+    def result(self):
+        if self._fn is not None:
+            fn, args = self._fn, self._args
+            self._fn = self._args = None
+            try:
+                self._value, self._error = fn(*args), None
+            except Exception as e:
+                self._value, self._error = None, e
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def cancel(self):
+        """尚未執行才取消（之後 result() 為 None）；已執行過的保留結果。"""
+        if self._fn is None:
+            return False
+        self._fn = self._args = None
+        self._value, self._error = None, None
+        return True
+
+
+def _load_template_input(input_path, cache_dir):
+    prs = open_presentation(input_path)
+    return prs, load_template_analysis(input_path, prs, cache_dir)
+
+
+def _prefetch_docx(doc_path):
+    """先把 Word 解析進 parse_meeting_docx 的快取；失敗留給真正使用時回報。"""
+    try:
+        parse_meeting_docx(doc_path)
+    except Exception:
+        pass
+
+
+class InputLoader:
+    """
+    同時開啟各輸入來源，以 take(name) 依序取用（name："template"、"report"、"proposal"、"doc"）。
+
+    - template 為 (prs, analyze_template 結果)；report / proposal 為以 open_source_presentation
+      開啟的來源簡報；doc 只預先解析進快取，take 回傳 None
+    - take 會交出所有權：loader 不再持有該來源，合併完就能釋放
+    - workers<=1 或在 Pyodide 中改為 take 時才載入，與原本依序處理相同
+    - 以 with 使用；離開時取消尚未開始的載入並等待進行中的完成
+    """
+
+    def __init__(self, input_path, report_path=None, doc_path=None, proposal_path=None, cache_dir=None,
+                 workers=None):
+        if workers is None:
+            workers = INPUT_LOAD_WORKERS
+        self._executor = None
+        if workers > 1 and _threads_available():
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="meeting-input")
+        self._futures = {}
+        # 先送出最慢的公版；Word 最後才需要，也最後送出
+        self._submit("template", _load_template_input, input_path, cache_dir)
+        if report_path is not None:
+            self._submit("report", open_source_presentation, report_path)
+        if proposal_path is not None:
+            self._submit("proposal", open_source_presentation, proposal_path)
+        if doc_path is not None:
+            self._submit("doc", _prefetch_docx, doc_path)
+
+    def _submit(self, name, fn, *args):
+        if self._executor is None:
+            self._futures[name] = _Deferred(fn, *args)
+        else:
+            self._futures[name] = self._executor.submit(fn, *args)
+
+    def take(self, name):
+        """等待並取出來源；未提供該來源時回傳 None。"""
+        future = self._futures.pop(name, None)
+        return None if future is None else future.result()
+
+    async def wait(self):
+        """在 asyncio event loop 中等待所有來源載入完成（不阻塞 loop），之後 take 不再需要等待。"""
+        import asyncio
+
+        if self._executor is None:
+            for future in self._futures.values():
+                try:
+                    future.result()
+                except Exception:
+                    pass  # 留給 take 回報
+            return self
+        await asyncio.wait([asyncio.wrap_future(f) for f in self._futures.values()])
+        return self
+
+    def close(self):
+        """取消尚未開始的載入；已載入但沒被 take 的來源簡報關閉其 zip。"""
+        for future in self._futures.values():
+            future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for name in ("report", "proposal"):
+            future = self._futures.get(name)
+            if future is None:
+                continue
+            try:
+                src_prs = future.result()
+            except Exception:
+                continue  # 取消或載入失敗，沒有開啟中的 zip
+            if src_prs is not None:
+                _close_source(src_prs)
+        self._futures.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── 主流程 ────────────────────────────────────────────────────────────────────
+
+def make_mapping(year, month, speaker, supervisor):
+    return {
+        "[[Title]]":    f"{year}年{month}月月例會",
+        "[[宣講員]]":   speaker,
+        "[[上級指導]]": supervisor,
+    }
+
+
+PROGRESS_STAGES = ("load", "replace", "report", "proposal_deck", "proposals", "save", "done")
+
+
+def _notify(progress, stage):
+    """progress 為 None 或 callable(stage)；stage 為 PROGRESS_STAGES 之一。啟用中的 RunStats 也以此分段。"""
+    if _active_stats is not None:
+        _active_stats.enter(stage)
+    if progress is not None:
+        progress(stage)
+
+
+def build_presentation(prs, mapping, report_path=None, doc_path=None, proposal_path=None, debug=False,
+                       rules=None, template=None, record=None, progress=None, inputs=None):
+    """
+    在已開啟的 prs 上做佔位符替換並插入報告／提案投影片（不存檔）。
+    template 為此公版的 analyze_template 結果（prs 必須是該公版未修改的內容）。
+    record 為 dict 時，寫入 "proposal_slides"（insert_proposal_slides 的回傳值）。
+    progress(stage) 在每個階段開始時呼叫（見 PROGRESS_STAGES）。
+    inputs 為 InputLoader 時，報告／提案簡報與 Word 從中取用（已在背景載入）。
+    """
+    take = inputs.take if inputs is not None else (lambda name: None)
+    _notify(progress, "replace")
+    mapping = compile_mapping(mapping)
+    openers = {k[:2] for k in mapping.mapping if k}
+    if template is not None and openers <= set(template["openers"]):
+        _replace_with_template(prs, mapping, template, debug)
+    else:
+        index = slide_text_index(prs)
+        for slide in prs.slides:
+            changed = replace_in_element(slide.part._element, mapping, debug)
+            if slide.has_notes_slide:
+                replace_in_element(slide.notes_slide.part._element, mapping, debug)
+            if changed:
+                index.invalidate(slide.slide_id)
+    media = MediaStore(prs) if report_path is not None or proposal_path is not None else None
+    plan = SlideOrderPlan(prs)
     if report_path is not None:
-        insert_report_slides(prs, report_path)
+        _notify(progress, "report")
+        insert_report_slides(prs, report_path, media=media, plan=plan, template=template,
+                             src_prs=take("report"), move=True)
     if proposal_path is not None:
-        insert_external_proposal_slides(prs, proposal_path)
+        _notify(progress, "proposal_deck")
+        insert_external_proposal_slides(prs, proposal_path, media=media, plan=plan, rules=rules,
+                                        template=template, src_prs=take("proposal"), move=True)
+    proposal_slides = None
     if doc_path is not None:
-        insert_proposal_slides(prs, doc_path, debug)
-    prs.save(str(output_path))
+        _notify(progress, "proposals")
+        take("doc")
+        proposal_slides = insert_proposal_slides(prs, doc_path, debug, plan=plan, template=template)
+    plan.apply()
+    if record is not None:
+        record["proposal_slides"] = proposal_slides
+    return prs
+
+
+# ── 增量重建 ──────────────────────────────────────────────────────────────────
+# 輸出旁記錄一份 <輸出>.build.json：各輸入檔的 sha256、替換內容、規則，
+# 以及每個提案的內容 hash 與其投影片 id。下次只有 Word 變動時，直接開啟上次的輸出，
+# 沿用未變的提案投影片，只重建內容有變的提案。
+
+BUILD_MANIFEST_VERSION = 1
+
+
+def _build_manifest_path(output_path):
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".build.json")
+
+
+def _rules_key(rules):
+    import json
+
+    if rules is None:
+        return None
+    if isinstance(rules, (str, Path)):
+        return _file_digest(rules)
+    # SlideRules 等無法序列化的物件用 repr，等同每次都完整重建
+    return json.dumps(rules, ensure_ascii=False, sort_keys=True, default=repr)
+
+
+def _build_inputs(input_path, mapping, report_path, proposal_path, rules):
+    """除了 Word 以外、會影響輸出的所有輸入；任何一項不同就必須完整重建。"""
+    return {
+        "version": BUILD_MANIFEST_VERSION,
+        "template": _file_digest(input_path),
+        "report": _file_digest(report_path) if report_path is not None else None,
+        "proposal": _file_digest(proposal_path) if proposal_path is not None else None,
+        "mapping": dict(mapping),
+        "rules": _rules_key(rules),
+    }
+
+
+def _read_build_manifest(output_path):
+    import json
+
+    try:
+        return json.loads(_build_manifest_path(output_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_build_manifest(output_path, inputs, doc_digest, proposal_slides):
+    import json
+
+    data = {"inputs": inputs, "doc": doc_digest, "proposal_slides": proposal_slides}
+    path = _build_manifest_path(output_path)
+    try:
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️  無法寫入增量紀錄 {path}：{e}", file=sys.stderr)
+
+
+def _patch_previous_output(output_path, doc_path, previous, debug=False, template=None):
+    """
+    在上次的輸出上只更新提案投影片：內容 hash 相同的提案沿用原投影片，其餘重新建立，
+    不再需要的投影片移除（不存檔）。回傳 (prs, 新的 proposal_slides 紀錄)；無法增量處理時回傳 None。
+    """
+    old = previous.get("proposal_slides")
+    if not old or not old["proposals"]:
+        return None
+
+    prs = open_presentation(output_path)
+    sld_id_lst = prs.slides._sldIdLst
+    sld_ids = {int(s.get("id")): s for s in sld_id_lst.sldId_lst}
+    old_ids = [sid for entry in old["proposals"] for sid in entry["slide_ids"]]
+    if any(sid not in sld_ids for sid in old_ids):
+        return None  # 上次的輸出被改過，不冒險
+    layout = next((l for l in prs.slide_layouts if str(l.part.partname) == old["layout"]), None)
+    if layout is None:
+        return None
+
+    items = parse_docx_proposals(doc_path)
+    if not items:
+        return None
+
+    reusable = {}
+    for entry in old["proposals"]:
+        reusable.setdefault(entry["hash"], []).append(entry)
+
+    rendering = None
+    proposals = []
+    rebuilt = 0
+    for item in items:
+        h = _proposal_hash(item)
+        if reusable.get(h):
+            proposals.append(reusable[h].pop(0))
+            continue
+        if rendering is None:
+            rendering = _prepare_proposal_rendering(prs, template, layout=layout)
+        proposals.append({"hash": h, "slide_ids": _render_proposal(prs, rendering, item, debug=debug)})
+        rebuilt += 1
+
+    # 新的提案投影片整組放回原本第一張提案投影片的位置；一次重寫 sldIdLst
+    new_ids = [sid for entry in proposals for sid in entry["slide_ids"]]
+    old_set, new_set = set(old_ids), set(new_ids)
+    position = next(i for i, s in enumerate(sld_id_lst.sldId_lst) if int(s.get("id")) in old_set)
+    sld_ids = {int(s.get("id")): s for s in sld_id_lst.sldId_lst}
+    others = [s for s in sld_id_lst.sldId_lst if int(s.get("id")) not in old_set | new_set]
+    # position 之前的都不是提案投影片，因此也是 others 的前 position 個
+    ordered = others[:position] + [sld_ids[sid] for sid in new_ids] + others[position:]
+
+    removed = [sld_ids[sid] for sid in old_ids if sid not in new_set]
+    for sld_id in list(sld_id_lst):
+        sld_id_lst.remove(sld_id)
+    for sld_id in ordered:
+        sld_id_lst.append(sld_id)
+    for sld_id in removed:
+        prs.part.drop_rel(sld_id.rId)
+
+    print(f"♻️  增量更新：沿用 {len(items) - rebuilt} 案、重建 {rebuilt} 案、移除 {len(removed)} 張舊投影片")
+    return prs, {"layout": old["layout"], "proposals": proposals}
+
+
+def replace_pptx(input_path, mapping, output_path, report_path=None, doc_path=None, proposal_path=None, debug=False,
+                 rules=None, cache_dir=None, incremental=False, progress=None, load_workers=None):
+    """
+    產生簡報並存到 output_path。
+    incremental=True 時在輸出旁記錄增量紀錄；若只有 Word 與上次不同，就只更新提案投影片。
+    progress(stage) 在每個階段開始時呼叫（見 PROGRESS_STAGES），結束時為 "done"。
+    各輸入以 InputLoader 同時載入；load_workers 為 thread 數（1 為依序處理）。
+    """
+    _notify(progress, "load")
+    if incremental:
+        inputs = _build_inputs(input_path, mapping, report_path, proposal_path, rules)
+        doc_digest = _file_digest(doc_path) if doc_path is not None else None
+        previous = _read_build_manifest(output_path)
+        if previous is not None and previous.get("inputs") == inputs and Path(output_path).exists():
+            if previous.get("doc") == doc_digest:
+                print(f"♻️  輸入皆未變更，沿用：{output_path}")
+                _notify(progress, "done")
+                return
+            if doc_digest is not None and previous.get("doc") is not None:
+                template = load_template_analysis(input_path, cache_dir=cache_dir)
+                _notify(progress, "proposals")
+                patched = _patch_previous_output(output_path, doc_path, previous, debug, template)
+                if patched is not None:
+                    prs, proposal_slides = patched
+                    _notify(progress, "save")
+                    save_presentation(prs, output_path)
+                    _write_build_manifest(output_path, inputs, doc_digest, proposal_slides)
+                    print(f"✅ 已儲存：{output_path}")
+                    _notify(progress, "done")
+                    return
+
+    record = {}
+    prs = None
+    try:
+        with InputLoader(input_path, report_path, doc_path, proposal_path, cache_dir, load_workers) as loader:
+            prs, template = loader.take("template")
+            build_presentation(prs, mapping, report_path=report_path, doc_path=doc_path,
+                               proposal_path=proposal_path, debug=debug, rules=rules, template=template,
+                               record=record, progress=progress, inputs=loader)
+        _notify(progress, "save")
+        save_presentation(prs, output_path)
+    finally:
+        if prs is not None:
+            close_sources(prs)
+    if incremental:
+        _write_build_manifest(output_path, inputs, doc_digest, record["proposal_slides"])
+    else:
+        # 非增量產生的輸出與舊紀錄對不上，刪掉避免下次誤用
+        _build_manifest_path(output_path).unlink(missing_ok=True)
     print(f"✅ 已儲存：{output_path}")
+    _notify(progress, "done")
+
+
+async def replace_pptx_async(*args, **kwargs):
+    """
+    replace_pptx 的 asyncio 版本：在 thread 中執行，不阻塞 event loop（參數相同）。
+    Pyodide 沒有 thread，直接在目前的 loop 中執行。
+    """
+    import asyncio
+
+    if not _threads_available():
+        return replace_pptx(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(None, lambda: replace_pptx(*args, **kwargs))
+
+
+# ── 批次處理 ──────────────────────────────────────────────────────────────────
+
+MANIFEST_FIELDS = ["year", "month", "speaker", "supervisor"]
+MANIFEST_PATH_FIELDS = ["report", "doc", "proposal", "output"]
+
+
+def load_manifest(manifest_path):
+    """
+    讀取批次清單（.csv 或 .json），回傳 job dict 的 list。
+
+    每筆需有 year / month / speaker / supervisor，
+    可選 report / doc / proposal / output（相對路徑以清單所在目錄為準）。
+    JSON 可以是 list，或 {"jobs": [...]}。
+    """
+    import csv
+    import json
+
+    manifest_path = Path(manifest_path)
+    if manifest_path.suffix.lower() == ".json":
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+        rows = data.get("jobs", []) if isinstance(data, dict) else data
+    else:
+        # utf-8-sig：Excel 另存的 CSV 會帶 BOM
+        with open(manifest_path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+
+    base_dir = manifest_path.parent
+    jobs = []
+    for n, row in enumerate(rows, start=1):
+        row = {k.strip(): (str(v).strip() if v is not None else "") for k, v in row.items() if k}
+        missing = [k for k in MANIFEST_FIELDS if not row.get(k)]
+        if missing:
+            raise ValueError(f"批次清單第 {n} 筆缺少欄位：{', '.join(missing)}")
+        job = {k: row[k] for k in MANIFEST_FIELDS}
+        job["index"] = n
+        for k in MANIFEST_PATH_FIELDS:
+            job[k] = (base_dir / row[k]) if row.get(k) else None
+        jobs.append(job)
+    return jobs
+
+
+def _batch_output_path(input_path, job):
+    if job.get("output") is not None:
+        return Path(job["output"])
+    return input_path.with_name(
+        f"{input_path.stem}_{job['year']}年{job['month']}月_{job['index']:03d}_replaced.pptx"
+    )
+
+
+class _TemplateBytes:
+    """
+    批次用的公版：只讀一次檔案內容，每筆 job 從這份內容重新開啟一個獨立的 Presentation。
+    不用 deepcopy(Presentation)：python-pptx 的 lazyproperty 一旦快取了 XML 節點，複本就會指向別棵樹。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.stamp = _file_stamp(self.path)  # 先取戳記再讀：讀取後檔案若有變動，存檔時就不會直接搬移
+        self.data = self.path.read_bytes()
+
+    def open(self):
+        import io
+
+        prs = Presentation(io.BytesIO(self.data))
+        _track_part_sources(prs, self.path, self.stamp)
+        return prs
+
+
+def _run_batch_job(template_data, input_path, job, debug=False, rules=None, template=None):
+    """以 template_data（_TemplateBytes）重新開啟的公版產生一份輸出；錯誤記錄在結果中而不往外拋。"""
+    import time
+
+    output_path = _batch_output_path(input_path, job)
+    result = {"index": job["index"], "year": job["year"], "month": job["month"],
+              "output": str(output_path), "seconds": 0.0, "error": None}
+    t0 = time.perf_counter()
+    prs = None
+    try:
+        prs = template_data.open()
+        build_presentation(
+            prs, make_mapping(job["year"], job["month"], job["speaker"], job["supervisor"]),
+            report_path=job.get("report"), doc_path=job.get("doc"),
+            proposal_path=job.get("proposal"), debug=debug, rules=rules, template=template,
+        )
+        save_presentation(prs, output_path)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if prs is not None:
+            close_sources(prs)
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+
+# 每個 worker process 只讀一次公版、分析一次
+_worker_template = None
+_worker_analysis = None
+
+
+def _init_batch_worker(input_path, cache_dir):
+    global _worker_template, _worker_analysis
+    _worker_template = _TemplateBytes(input_path)
+    _worker_analysis = load_template_analysis(input_path, _worker_template.open(), cache_dir)
+
+
+def _run_batch_job_in_worker(input_path, job, debug, rules):
+    return _run_batch_job(_worker_template, input_path, job, debug, rules, _worker_analysis)
+
+
+def run_batch(input_path, manifest_path, workers=1, debug=False, rules=None, cache_dir=None):
+    """
+    依批次清單產生多份簡報。公版只讀一次、分析一次，每筆 job 從讀出的內容重新開啟；
+    workers > 1 時以 process pool 平行處理（每個 process 各讀一次、分析一次公版）。
+    回傳每筆 job 的結果（output / seconds / error）。
+    """
+    import time
+
+    input_path = Path(input_path)
+    jobs = load_manifest(manifest_path)
+    rules = load_slide_rules(rules)
+    t0 = time.perf_counter()
+
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(input_path, cache_dir)) as pool:
+            futures = [pool.submit(_run_batch_job_in_worker, input_path, job, debug, rules) for job in jobs]
+            results = [f.result() for f in futures]
+    else:
+        template_data = _TemplateBytes(input_path)
+        template = load_template_analysis(input_path, template_data.open(), cache_dir)
+        results = [_run_batch_job(template_data, input_path, job, debug, rules, template) for job in jobs]
+
+    elapsed = time.perf_counter() - t0
+    failed = [r for r in results if r["error"]]
+    print(f"\n--- 批次結果（共 {len(results)} 筆，失敗 {len(failed)} 筆，總計 {elapsed:.2f} 秒）---")
+    for r in results:
+        mark = "❌" if r["error"] else "✅"
+        detail = r["error"] or r["output"]
+        print(f"{mark} #{r['index']:<3} {r['year']}年{r['month']}月  {r['seconds']:6.2f}s  {detail}")
+    return results
 
 
 # ── CLI ───────────────────────────────────────────────────────────────────────
 
-def run_replace(year, month, speaker, supervisor, has_report, has_doc, has_proposal):
-    mapping = {
-        "[[Title]]":    f"{year}年{month}月月例會",
-        "[[宣講員]]":   speaker,
-        "[[上級指導]]": supervisor,
-    }
+def _write_stats(stats, stats_path):
+    """stats_path 為 "-" 時印到 stdout。"""
+    if stats_path == "-":
+        print(stats.to_json())
+    else:
+        Path(stats_path).write_text(stats.to_json(), encoding="utf-8")
+
+
+def run_replace(year, month, speaker, supervisor, has_report, has_doc, has_proposal, progress=None,
+                stats_path=None, profile=False, trace_memory=False):
+    from contextlib import nullcontext
+
+    mapping = make_mapping(year, month, speaker, supervisor)
     input_path = Path('/slide-template.pptx')
     output_path = Path('/output.pptx')
     report_path = Path('/report.pptx') if has_report else None
     doc_path = Path('/doc.docx') if has_doc else None
     proposal_path = Path('/proposal.pptx') if has_proposal else None
     
-    replace_pptx(input_path, mapping, output_path, report_path=report_path, doc_path=doc_path, proposal_path=proposal_path, debug=False)
+    # stats_path 有給時把各階段耗時與計數寫成 JSON
+    stats = RunStats(trace_memory=trace_memory, profile=profile) if stats_path else None
+    with stats if stats is not None else nullcontext():
+        # 同一頁面反覆產生時（通常只改了 Word），沿用上次的 /output.pptx 只更新提案投影片
+        replace_pptx(input_path, mapping, output_path, report_path=report_path, doc_path=doc_path, proposal_path=proposal_path, debug=False,
+                     incremental=True, progress=progress)
+    if stats is not None:
+        _write_stats(stats, stats_path)
     
     # 擷取文字回傳給前端
     summary_text = ""
@@ -653,15 +2618,27 @@ def run_replace(year, month, speaker, supervisor, has_report, has_doc, has_propo
     return summary_text
         
 def main():
+    from contextlib import nullcontext
+
     parser = argparse.ArgumentParser(description="替換 PPTX 佔位符並合併報告投影片。")
     parser.add_argument("input", help="輸入的 .pptx 檔案路徑")
-    parser.add_argument("--year", required=True, help="年份")
-    parser.add_argument("--month", required=True, help="月份")
-    parser.add_argument("--speaker", required=True, help="宣講員姓名")
-    parser.add_argument("--supervisor", required=True, help="上級指導姓名")
+    parser.add_argument("--year", help="年份")
+    parser.add_argument("--month", help="月份")
+    parser.add_argument("--speaker", help="宣講員姓名")
+    parser.add_argument("--supervisor", help="上級指導姓名")
     parser.add_argument("--report", help="選填：要插入的報告 .pptx 檔案路徑")
     parser.add_argument("--proposal", help="選填：聯合月例會的提案 .pptx 檔案路徑")
     parser.add_argument("--doc", help="選填：要匯入提案的 .docx 檔案路徑")
+    parser.add_argument("--batch", help="選填：批次清單 .csv / .json，一次產生多份簡報")
+    parser.add_argument("--workers", type=int, default=1, help="批次模式的平行 process 數（預設 1）")
+    parser.add_argument("--rules", help="選填：提案簡報投影片篩選規則 .json（預設使用內建規則）")
+    parser.add_argument("--cache-dir", help="選填：公版分析快取目錄（預設 ~/.cache/meeting_slide_tool）")
+    parser.add_argument("--no-cache", action="store_true", help="不讀寫公版分析的磁碟快取")
+    parser.add_argument("--incremental", action="store_true",
+                        help="沿用上次的輸出，只重建內容有變的提案投影片（紀錄存於 <輸出>.build.json）")
+    parser.add_argument("--stats", help="選填：把各階段耗時、記憶體與計數寫成 JSON（- 表示印到畫面）")
+    parser.add_argument("--profile", action="store_true", help="以 cProfile 記錄，結果附在 --stats 的 JSON 中")
+    parser.add_argument("--trace-memory", action="store_true", help="以 tracemalloc 記錄各階段的記憶體高峰")
     parser.add_argument("--debug", action="store_true", help="印出 XML 診斷資訊")
 
     args = parser.parse_args()
@@ -671,24 +2648,42 @@ def main():
         print(f"❌ 找不到輸入檔案：{input_path}", file=sys.stderr)
         sys.exit(1)
 
+    cache_dir = False if args.no_cache else args.cache_dir
+
+    stats_path = args.stats or ("-" if args.profile or args.trace_memory else None)
+
+    if args.batch:
+        if stats_path:
+            parser.error("--stats / --profile / --trace-memory 不支援批次模式")
+        results = run_batch(input_path, args.batch, workers=args.workers, debug=args.debug, rules=args.rules,
+                            cache_dir=cache_dir)
+        sys.exit(1 if any(r["error"] for r in results) else 0)
+
+    missing = [f"--{k}" for k in MANIFEST_FIELDS if not getattr(args, k)]
+    if missing:
+        parser.error(f"缺少必要參數：{' '.join(missing)}（或改用 --batch）")
+
     output_path = input_path.with_name(f"{input_path.stem}_replaced.pptx")
     report_path = Path(args.report) if args.report else None
     proposal_path = Path(args.proposal) if args.proposal else None
     doc_path = Path(args.doc) if args.doc else None
 
-    mapping = {
-        "[[Title]]":    f"{args.year}年{args.month}月月例會",
-        "[[宣講員]]":   args.speaker,
-        "[[上級指導]]": args.supervisor,
-    }
-
-    replace_pptx(
-        input_path, mapping, output_path,
-        report_path=report_path,
-        proposal_path=proposal_path,
-        doc_path=doc_path,
-        debug=args.debug
-    )
+    mapping = make_mapping(args.year, args.month, args.speaker, args.supervisor)
+
+    stats = RunStats(trace_memory=args.trace_memory, profile=args.profile) if stats_path else None
+    with stats if stats is not None else nullcontext():
+        replace_pptx(
+            input_path, mapping, output_path,
+            report_path=report_path,
+            proposal_path=proposal_path,
+            doc_path=doc_path,
+            debug=args.debug,
+            rules=args.rules,
+            cache_dir=cache_dir,
+            incremental=args.incremental,
+        )
+    if stats is not None:
+        _write_stats(stats, stats_path)
 
     if doc_path:
         print("\n--- 提取的提案文字摘要 ---")
@@ -698,4 +2693,4 @@ def main():
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
-        main()
+        main()
\ No newline at end of file
@@ -0,0 +1,165 @@
+// 共用的 Pyodide 啟動流程（replaceMeetingSlide.html、convertMeetingWord.html 共用）
+//
+// 第一次：loadPyodide → micropip 從網路安裝套件 → 把這次新裝的 wheel 與清單存進 Cache Storage。
+// 之後：直接從 Cache Storage 取出 wheel 寫進 Pyodide 檔案系統，以 micropip 離線安裝（不再查 PyPI）。
+// 快取只省下網路下載（PyPI 查詢與 wheel 下載）：每次啟動仍要重新啟動直譯器、
+// 解壓安裝 wheel、import 模組，並沒有保存安裝好的環境；階段計時的說明也標明這點。
+// 這裡只「安裝」不 import；pptx、lxml、docx 等重量級模組由 deferImport 在閒置或第一次使用時才載入。
+// 不使用 DOM，也可以在 Web Worker 裡以 importScripts 載入。
+
+const PYODIDE_INDEX_URL = 'https://cdn.jsdelivr.net/pyodide/v0.29.3/full/';
+const WHEEL_CACHE_PREFIX = 'lanyang-pyodide-wheels-';
+const WHEEL_DIR = '/tmp/wheels';
+
+const BOOT_STAGE_LABELS = {
+    pyodide: '載入 Pyodide',
+    micropip: '載入 micropip',
+    packages: '安裝套件',
+    imports: '載入模組',
+};
+
+function createBootTimer(onStage) {
+    const t0 = performance.now();
+    let last = t0;
+    const stages = [];
+    return {
+        stages,
+        mark(name, detail) {
+            const now = performance.now();
+            const stage = { name, ms: Math.round(now - last), detail: detail || '' };
+            stages.push(stage);
+            last = now;
+            if (onStage) onStage(stage, stages);
+        },
+        total() {
+            return Math.round(performance.now() - t0);
+        },
+    };
+}
+
+function formatBootStages(stages) {
+    return stages
+        .map(s => `${BOOT_STAGE_LABELS[s.name] || s.name} ${(s.ms / 1000).toFixed(1)}s${s.detail ? `（${s.detail}）` : ''}`)
+        .join('・');
+}
+
+function normalizePackageName(name) {
+    return name.toLowerCase().replace(/[-_.]+/g, '-');
+}
+
+function wheelLockKey(packages) {
+    // Cache Storage 的 key 必須是 http(s) URL；這個網址不會真的被請求
+    return `${self.location.origin}/__pyodide_boot__/${encodeURIComponent(packages.join(','))}.json`;
+}
+
+async function openWheelCache(version) {
+    if (typeof caches === 'undefined') return null; // 非 https 或瀏覽器不支援
+    try {
+        return await caches.open(WHEEL_CACHE_PREFIX + version);
+    } catch (e) {
+        return null;
+    }
+}
+
+async function installFromCache(pyodide, cache, packages) {
+    const lockResp = await cache.match(wheelLockKey(packages));
+    if (!lockResp) return false;
+    const wheels = await lockResp.json();
+
+    pyodide.FS.mkdirTree(WHEEL_DIR);
+    const paths = [];
+    for (const w of wheels) {
+        const resp = await cache.match(w.url);
+        if (!resp) return false;
+        const path = `${WHEEL_DIR}/${w.file}`;
+        pyodide.FS.writeFile(path, new Uint8Array(await resp.arrayBuffer()));
+        paths.push('emfs:' + path);
+    }
+
+    // 清單內已含所有相依套件，不必再解析（也就不必連 PyPI）
+    pyodide.globals.set('_boot_wheels', pyodide.toPy(paths));
+    try {
+        await pyodide.runPythonAsync('import micropip\nawait micropip.install(_boot_wheels, deps=False)');
+    } finally {
+        pyodide.globals.delete('_boot_wheels');
+    }
+    return true;
+}
+
+async function installFromNetwork(pyodide, cache, packages) {
+    const micropip = pyodide.pyimport('micropip');
+    const before = new Set(Object.keys(pyodide.loadedPackages).map(normalizePackageName));
+    await micropip.install(packages);
+    if (!cache) return;
+
+    // 記下這次新裝的 wheel 網址，存進快取；任何一步失敗都只是下次照常走網路
+    try {
+        const lock = JSON.parse(micropip.freeze());
+        const entries = {};
+        for (const [name, entry] of Object.entries(lock.packages)) {
+            entries[normalizePackageName(name)] = entry;
+        }
+        const wheels = [];
+        for (const name of Object.keys(pyodide.loadedPackages).map(normalizePackageName)) {
+            if (before.has(name)) continue;
+            const entry = entries[name];
+            if (!entry) return;
+            const url = new URL(entry.file_name, PYODIDE_INDEX_URL).href;
+            wheels.push({ name, url, file: url.split('/').pop().split('?')[0] });
+        }
+        for (const w of wheels) {
+            if (!(await cache.match(w.url))) await cache.add(w.url);
+        }
+        await cache.put(wheelLockKey(packages), new Response(JSON.stringify(wheels), {
+            headers: { 'Content-Type': 'application/json' },
+        }));
+    } catch (e) {
+        console.warn('wheel 快取失敗（不影響使用）:', e);
+    }
+}
+
+// 啟動 Pyodide 並安裝 packages；回傳 { pyodide, stages, total, fromCache }。
+// onStage(stage, stages) 在每個階段完成時呼叫，可用來顯示進度。
+async function bootPyodide({ packages, onStage }) {
+    const timer = createBootTimer(onStage);
+
+    const pyodide = await loadPyodide({ indexURL: PYODIDE_INDEX_URL });
+    timer.mark('pyodide', 'v' + pyodide.version);
+
+    await pyodide.loadPackage(['micropip']);
+    timer.mark('micropip');
+
+    const cache = await openWheelCache(pyodide.version);
+    let fromCache = false;
+    if (cache) {
+        try {
+            fromCache = await installFromCache(pyodide, cache, packages);
+        } catch (e) {
+            console.warn('從快取安裝失敗，改由網路安裝:', e);
+        }
+    }
+    if (!fromCache) await installFromNetwork(pyodide, cache, packages);
+    // 從快取安裝只是省下下載，解壓安裝仍在這個階段的時間內
+    timer.mark('packages', fromCache ? 'wheel 取自快取，只省下載' : '網路下載');
+
+    return { pyodide, stages: timer.stages, total: timer.total(), fromCache };
+}
+
+// 回傳一個只會執行一次 code 的函式；並在閒置時先行暖機，
+// 使用者第一次按下按鈕時通常已經載入完成。onDone(ms) 於暖機成功後呼叫。
+function deferImport(pyodide, code, onDone) {
+    let promise = null;
+    const run = () => {
+        if (!promise) {
+            const t0 = performance.now();
+            promise = pyodide.runPythonAsync(code).then(result => {
+                if (onDone) onDone(Math.round(performance.now() - t0));
+                return result;
+            });
+        }
+        return promise;
+    };
+    const idle = self.requestIdleCallback || (cb => setTimeout(cb, 200));
+    idle(() => run().catch(() => {})); // 暖機失敗時留給真正使用時回報
+    return run;
+}